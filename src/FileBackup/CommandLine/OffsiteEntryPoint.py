@@ -127,6 +127,20 @@ def Execute(
             "--ignore-pending-snapshot", help="Disable the pending warning snapshot and continue."
         ),
     ] = False,
+    skip_archive_validation: Annotated[
+        bool,
+        typer.Option(
+            "--skip-archive-validation",
+            help="Do not test compressed/encrypted archives after they are created; this avoids reading every archive volume a second time.",
+        ),
+    ] = False,
+    hash_cache: Annotated[
+        bool,
+        typer.Option(
+            "--hash-cache",
+            help="Reuse hash values calculated during the previous backup for files whose size and modification time have not changed.",
+        ),
+    ] = False,
     file_include_params: Annotated[
         list[str],
         CommandLineArguments.file_include_option,
@@ -171,6 +185,8 @@ def Execute(
                 file_excludes=file_excludes,
                 archive_volume_size=archive_volume_size,
                 ignore_pending_snapshot=ignore_pending_snapshot,
+                validate_archive=not skip_archive_validation,
+                use_hash_cache=hash_cache,
             )
 
 
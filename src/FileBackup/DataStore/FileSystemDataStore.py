@@ -82,13 +82,17 @@ class FileSystemDataStore(FileBasedDataStore):
         self,
         path: Path,
     ) -> Path:
-        if path.parts[0] == "/":
-            path = Path(*path.parts[1:])
-        elif path.parts[0]:
-            # Probably on Windows
-            path = Path(path.parts[0].replace(":", "_").rstrip("\\")) / Path(*path.parts[1:])
+        return self._working_dir / _SnapshotFilenameToRelativePath(path)
 
-        return self.GetWorkingDir() / path
+    # ----------------------------------------------------------------------
+    @override
+    def SnapshotFilenamesToDestinationNames(
+        self,
+        paths: list[Path],
+    ) -> list[Path]:
+        working_dir = self._working_dir
+
+        return [working_dir / _SnapshotFilenameToRelativePath(path) for path in paths]
 
     # ----------------------------------------------------------------------
     @override
@@ -147,6 +151,24 @@ class FileSystemDataStore(FileBasedDataStore):
     ) -> int:
         return (self._working_dir / path).stat().st_size
 
+    # ----------------------------------------------------------------------
+    @override
+    def GetFileFingerprint(
+        self,
+        path: Path,
+    ) -> Optional[tuple[int, ...]]:
+        stat_result = (self._working_dir / path).stat()
+
+        # The modification time alone isn't sufficient, as it may be preserved or restored by tools
+        # that modify content (e.g. 'cp -p', 'rsync -t', 'touch -r'); the change time can't be set
+        # and the inode changes when a file is replaced.
+        return (
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+            stat_result.st_ino,
+            stat_result.st_ctime_ns,
+        )
+
     # ----------------------------------------------------------------------
     @override
     def RemoveDir(
@@ -216,3 +238,51 @@ class FileSystemDataStore(FileBasedDataStore):
     ]:
         for root, directories, filenames in os.walk(self._working_dir / path):
             yield Path(root), directories, filenames
+
+    # ----------------------------------------------------------------------
+    def WalkFileSizes(
+        self,
+        path: Path = Path(),
+    ) -> Generator[
+        tuple[
+            Path,  # filename
+            int,  # file size
+        ],
+        None,
+        None,
+    ]:
+        """\
+        Yields the files under path (with the same semantics as Walk) and their sizes; the sizes
+        are retrieved from the directory entries, which avoids a separate stat call on platforms
+        that cache that information (e.g. Windows).
+        """
+
+        directories: list[str] = [str(self._working_dir / path)]
+
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Walk doesn't follow symlinked directories
+                        if not entry.is_symlink():
+                            directories.append(entry.path)
+                    else:
+                        yield Path(entry.path), entry.stat().st_size
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _SnapshotFilenameToRelativePath(
+    path: Path,
+) -> Path:
+    if path.parts[0] == "/":
+        return Path(*path.parts[1:])
+
+    if path.parts[0]:
+        # Probably on Windows
+        return Path(path.parts[0].replace(":", "_").rstrip("\\")) / Path(*path.parts[1:])
+
+    return path
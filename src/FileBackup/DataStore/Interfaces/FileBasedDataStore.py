@@ -51,6 +51,14 @@ class FileBasedDataStore(DataStore):
         """Convert from the actual root used when persisting the file (e.g. "C:\\") to the corresponding value on this system"""
         raise Exception("Abstract method")  # pragma: no cover
 
+    # ----------------------------------------------------------------------
+    def SnapshotFilenamesToDestinationNames(
+        self,
+        paths: list[Path],
+    ) -> list[Path]:
+        """Converts multiple paths; derived classes can override this method to amortize per-call overhead"""
+        return [self.SnapshotFilenameToDestinationName(path) for path in paths]
+
     # ----------------------------------------------------------------------
     @abstractmethod
     def GetBytesAvailable(self) -> Optional[int]:
@@ -90,6 +98,14 @@ class FileBasedDataStore(DataStore):
         """Returns the file item's size"""
         raise Exception("Abstract method")  # pragma: no cover
 
+    # ----------------------------------------------------------------------
+    def GetFileFingerprint(
+        self,
+        path: Path,  # pylint: disable=unused-argument
+    ) -> Optional[tuple[int, ...]]:
+        """Returns values that change when the file's content changes (beginning with the size and modification time in nanoseconds), or None if this information isn't available"""
+        return None
+
     # ----------------------------------------------------------------------
     @abstractmethod
     def RemoveDir(
@@ -14,6 +14,7 @@
 """Implements functionality used by both Mirror and Offsite"""
 
 import hashlib
+import io
 import os
 import re
 import textwrap
@@ -93,7 +94,7 @@ class DiffOperation(Enum):
 
 
 # ----------------------------------------------------------------------
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DirHashPlaceholder(object):
     """Object that signals the absence of a hash value because the associated item is a directory"""
 
@@ -110,7 +111,7 @@ class DirHashPlaceholder(object):
 
 
 # ----------------------------------------------------------------------
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DiffResult:
     """Represents a difference between a file at a source and destination"""
 
@@ -518,26 +519,50 @@ def WriteFile(
     source_filename: Path,
     dest_filename: Path,
     status_func: Callable[[int], None],
+    *,
+    expected_hash: Optional[str] = None,
+    make_dirs: bool = True,
 ) -> None:
+    """Writes the file to the data store, verifying `expected_hash` (if provided) as the content is written"""
+
     temp_dest_filename = (
         dest_filename.parent / f"{dest_filename.stem}.__temp__{dest_filename.suffix}"
     )
 
+    hasher = hashlib.sha512() if expected_hash is not None else None
+
     with source_filename.open("rb") as source:
-        data_store.MakeDirs(temp_dest_filename.parent)
+        # The source is read once from beginning to end, and its content isn't needed in the page
+        # cache once it has been written.
+        _AdviseFile(source, "POSIX_FADV_SEQUENTIAL")
+
+        if make_dirs:
+            data_store.MakeDirs(temp_dest_filename.parent)
 
         with data_store.Open(temp_dest_filename, "wb") as dest:
-            bytes_written = 0
+            # Let the kernel copy the content when possible (this isn't possible when the content
+            # is being hashed)
+            if hasher is not None or not _CopyFileRange(source, dest, status_func):
+                bytes_written = 0
+
+                while True:
+                    chunk = source.read(_IO_CHUNK_SIZE)
+                    if not chunk:
+                        break
 
-            while True:
-                chunk = source.read(16384)
-                if not chunk:
-                    break
+                    dest.write(chunk)
 
-                dest.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
 
-                bytes_written += len(chunk)
-                status_func(bytes_written)
+                    bytes_written += len(chunk)
+                    status_func(bytes_written)
+
+        _AdviseFile(source, "POSIX_FADV_DONTNEED")
+
+    if hasher is not None and hasher.hexdigest() != expected_hash:
+        data_store.RemoveFile(temp_dest_filename)
+        raise Exception(f"The content of '{source_filename}' changed after it was hashed.")
 
     data_store.Rename(temp_dest_filename, dest_filename)
 
@@ -657,17 +682,94 @@ def CalculateHash(
 ) -> str:
     hasher = hashlib.sha512()
 
+    # Read into a single preallocated buffer rather than allocating a new bytes object for every
+    # chunk.
+    buffer = bytearray(_IO_CHUNK_SIZE)
+    buffer_view = memoryview(buffer)
+
     bytes_hashed = 0
 
     with data_store.Open(input_item, "rb") as f:
         while True:
-            chunk = f.read(16384)
-            if not chunk:
+            num_bytes = f.readinto(buffer)
+            if not num_bytes:
                 break
 
-            hasher.update(chunk)
+            hasher.update(buffer_view[:num_bytes])
 
-            bytes_hashed += len(chunk)
+            bytes_hashed += num_bytes
             status(bytes_hashed)
 
     return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+_IO_CHUNK_SIZE = 1024 * 1024
+
+
+# ----------------------------------------------------------------------
+def _AdviseFile(
+    f: Any,
+    advice_name: str,
+) -> None:
+    """Provides an access pattern hint for the file's content when the platform supports it"""
+
+    posix_fadvise = getattr(os, "posix_fadvise", None)
+    advice = getattr(os, advice_name, None)
+
+    if posix_fadvise is None or advice is None:
+        return
+
+    try:
+        posix_fadvise(f.fileno(), 0, 0, advice)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        # The hint is optional
+        pass
+
+
+# ----------------------------------------------------------------------
+def _CopyFileRange(
+    source: Any,
+    dest: Any,
+    status_func: Callable[[int], None],
+) -> bool:
+    """Copies content via `os.copy_file_range`; returns False if that isn't supported for these files"""
+
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is None:
+        return False
+
+    try:
+        source_fd = source.fileno()
+        dest_fd = dest.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+    bytes_written = 0
+
+    while True:
+        try:
+            result = copy_file_range(source_fd, dest_fd, _IO_CHUNK_SIZE)
+        except OSError:
+            # Not supported for these files (for example, across some file systems)
+            if bytes_written == 0:
+                return False
+
+            raise
+
+        if result == 0:
+            # Some files (e.g. those on procfs, sysfs, and some FUSE file systems) report no
+            # content even though content is available when read.
+            if bytes_written == 0:
+                return False
+
+            break
+
+        bytes_written += result
+        status_func(bytes_written)
+
+    return True
@@ -17,13 +17,15 @@ locally will be removed from the backup data store; files modified locally will
 backup data store.
 """
 
+import functools
 import itertools
 import shutil
 import textwrap
 
 from enum import Enum
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, cast, Optional, Pattern
+from typing import Any, Callable, cast, Optional, Pattern
 
 from dbrownell_Common.ContextlibEx import ExitStack  # type: ignore[import-untyped]
 from dbrownell_Common import ExecuteTasks  # type: ignore[import-untyped]
@@ -56,6 +58,29 @@ class ValidateType(str, Enum):
     complete = "complete"  # File names, sizes, and hash values are validated
 
 
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+_MODIFIED_TEMPLATE = textwrap.dedent(
+    """\
+    '{}' has been modified.
+
+        Expected file size:     {}
+        Actual file size:       {}
+    {}
+    """,
+)
+
+_MODIFIED_HASH_TEMPLATE = textwrap.dedent(
+    """\
+    Expected hash value:    {}
+    Actual hash value:      {}
+    """,
+)
+
+
 # ----------------------------------------------------------------------
 # |
 # |  Public Functions
@@ -159,7 +184,11 @@ def Backup(
 
             with ExitStack(lambda: shutil.rmtree(temp_directory)):
                 with persist_dm.Nested("Creating snapshot data...") as snapshot_dm:
-                    local_snapshot.Persist(snapshot_dm, FileSystemDataStore(temp_directory))
+                    snapshot_size = local_snapshot.Persist(
+                        snapshot_dm,
+                        FileSystemDataStore(temp_directory),
+                    )
+
                     if snapshot_dm.result != 0:
                         return
 
@@ -177,10 +206,11 @@ def Backup(
                                 stdout_context.stream
                             ),
                             transient=True,
+                            refresh_per_second=Common.EXECUTE_TASKS_REFRESH_PER_SECOND,
                         ) as progress_bar:
                             total_progress_id = progress_bar.add_task(
                                 f"{stdout_context.line_prefix}Total Progress",
-                                total=source_filename.stat().st_size,
+                                total=snapshot_size,
                                 status="",
                                 visible=True,
                             )
@@ -210,12 +240,14 @@ def Backup(
 
                 # If force, mark the original content items for deletion
                 if force:
+                    pending_delete_extension = Common.PENDING_DELETE_EXTENSION
+
                     for root, directories, filenames in destination_data_store.Walk():
                         for item in itertools.chain(directories, filenames):
                             fullpath = root / item
 
                             delete_filename = fullpath.parent / (
-                                fullpath.name + Common.PENDING_DELETE_EXTENSION
+                                fullpath.name + pending_delete_extension
                             )
 
                             destination_data_store.Rename(fullpath, delete_filename)
@@ -229,31 +261,6 @@ def Backup(
                         "Marking content to be removed...",
                         suffix="\n",
                     ) as this_dm:
-                        # ----------------------------------------------------------------------
-                        def Remove(
-                            context: Any,
-                            status: ExecuteTasks.Status,
-                        ) -> Optional[Path]:
-                            pending_dest_filename = create_destination_path_func(
-                                cast(Path, context),
-                                Common.PENDING_DELETE_EXTENSION,
-                            )
-
-                            original_dest_filename = pending_dest_filename.with_suffix("")
-
-                            if not destination_data_store.GetItemType(original_dest_filename):
-                                status.OnInfo(f"'{original_dest_filename}' no longer exists.\n")
-                                return None
-
-                            destination_data_store.Rename(
-                                original_dest_filename,
-                                pending_dest_filename,
-                            )
-
-                            return pending_dest_filename
-
-                        # ----------------------------------------------------------------------
-
                         pending_delete_items += cast(
                             list[Optional[Path]],
                             ExecuteTasks.TransformTasks(
@@ -266,7 +273,11 @@ def Backup(
                                         diffs[Common.DiffOperation.remove],
                                     )
                                 ],
-                                Remove,
+                                functools.partial(
+                                    _MarkPendingDelete,
+                                    destination_data_store,
+                                    create_destination_path_func,
+                                ),
                                 quiet=quiet,
                                 max_num_threads=(
                                     None if destination_data_store.ExecuteInParallel() else 1
@@ -320,34 +331,21 @@ def Backup(
                             ),
                         ),
                     ]:
-                        if not any(item for item in items):
+                        tasks = [
+                            ExecuteTasks.TaskData(str(fullpath), fullpath)
+                            for fullpath in items
+                            if fullpath
+                        ]
+
+                        if not tasks:
                             continue
 
                         with persist_dm.Nested(desc, suffix="\n") as this_dm:
-                            # ----------------------------------------------------------------------
-                            def Commit(
-                                context: Any,
-                                status: ExecuteTasks.Status,  # pylint: disable=unused-argument
-                            ) -> None:
-                                fullpath = cast(Path, context)
-                                del context
-
-                                item_type = destination_data_store.GetItemType(fullpath)
-
-                                if item_type is not None:
-                                    func(fullpath, item_type)
-
-                            # ----------------------------------------------------------------------
-
                             ExecuteTasks.TransformTasks(
                                 this_dm,
                                 "Processing",
-                                [
-                                    ExecuteTasks.TaskData(str(fullpath), fullpath)
-                                    for fullpath in items
-                                    if fullpath
-                                ],
-                                Commit,
+                                tasks,
+                                functools.partial(_CommitPendingItem, destination_data_store, func),
                                 quiet=quiet,
                                 max_num_threads=(
                                     None if destination_data_store.ExecuteInParallel() else 1
@@ -431,26 +429,17 @@ def Validate(
             # the backup with the values of the current snapshot are based on what is on the file
             # system. Convert the data in the mirror snapshot so it matches the values in the
             # current snapshot before we compare the contents of each.
-            new_root = Snapshot.Node(
-                None, None, Common.DirHashPlaceholder(explicitly_added=False), None
+            mirrored_nodes = _GetLeafNodes(mirrored_snapshot.node)
+            mirrored_paths = destination_data_store.SnapshotFilenamesToDestinationNames(
+                [node.fullpath for node in mirrored_nodes],
             )
 
-            for node in mirrored_snapshot.node.Enum():
-                destination_path = destination_data_store.SnapshotFilenameToDestinationName(
-                    node.fullpath
-                )
+            mirrored_root: Optional[Snapshot.Node] = None
 
-                if node.is_dir:
-                    if not node.children:
-                        new_root.AddDir(destination_path, force=True)
-                elif node.is_file:
-                    new_root.AddFile(
-                        destination_path,
-                        cast(str, node.hash_value),
-                        cast(int, node.file_size),
-                    )
-                else:
-                    assert False, node  # pragma: no cover
+            if validate_type != ValidateType.standard or _CreateFileSizeLookup(
+                _GetLeafNodes(current_snapshot.node)
+            ) != _CreateFileSizeLookup(mirrored_nodes, mirrored_paths):
+                mirrored_root = _CreateDestinationNode(mirrored_nodes, mirrored_paths)
 
         with dm.Nested(
             "Validating content...",
@@ -458,18 +447,22 @@ def Validate(
         ) as validate_dm:
             # Windows and Linux have different sorting orders, so capture and sort the list before
             # displaying the contents.
-            diffs = list(
-                current_snapshot.Diff(
-                    Snapshot(new_root),
-                    compare_hashes=validate_type == ValidateType.complete,
+            if mirrored_root is None:
+                # Standard validation only compares names and sizes, and those are identical
+                diffs = []
+            else:
+                diffs = list(
+                    current_snapshot.Diff(
+                        Snapshot(mirrored_root),
+                        compare_hashes=validate_type == ValidateType.complete,
+                    )
                 )
-            )
 
             if not diffs:
                 validate_dm.WriteInfo("No differences were found.\n")
                 return
 
-            diffs.sort(key=lambda diff: diff.path)
+            diffs.sort(key=attrgetter("path"))
 
             for diff in diffs:
                 if diff.operation == Common.DiffOperation.add:
@@ -481,15 +474,7 @@ def Validate(
                     assert diff.other_file_size is not None
 
                     validate_dm.WriteWarning(
-                        textwrap.dedent(
-                            """\
-                            '{}' has been modified.
-
-                                Expected file size:     {}
-                                Actual file size:       {}
-                            {}
-                            """,
-                        ).format(
+                        _MODIFIED_TEMPLATE.format(
                             diff.path,
                             diff.other_file_size,
                             diff.this_file_size,
@@ -497,12 +482,7 @@ def Validate(
                                 ""
                                 if diff.this_hash == "not calculated"
                                 else TextwrapEx.Indent(
-                                    textwrap.dedent(
-                                        f"""\
-                                    Expected hash value:    {diff.other_hash}
-                                    Actual hash value:      {diff.this_hash}
-                                    """,
-                                    ),
+                                    _MODIFIED_HASH_TEMPLATE.format(diff.other_hash, diff.this_hash),
                                     4,
                                 )
                             ),
@@ -516,6 +496,92 @@ def Validate(
 # |
 # |  Private Functions
 # |
+# ----------------------------------------------------------------------
+def _MarkPendingDelete(
+    destination_data_store: FileBasedDataStore,
+    create_destination_path_func: Callable[[Path, str], Path],
+    context: Any,
+    status: ExecuteTasks.Status,
+) -> Optional[Path]:
+    pending_dest_filename = create_destination_path_func(
+        cast(Path, context),
+        Common.PENDING_DELETE_EXTENSION,
+    )
+
+    original_dest_filename = pending_dest_filename.with_suffix("")
+
+    if not destination_data_store.GetItemType(original_dest_filename):
+        status.OnInfo(f"'{original_dest_filename}' no longer exists.\n")
+        return None
+
+    destination_data_store.Rename(
+        original_dest_filename,
+        pending_dest_filename,
+    )
+
+    return pending_dest_filename
+
+
+# ----------------------------------------------------------------------
+def _CommitPendingItem(
+    destination_data_store: FileBasedDataStore,
+    commit_func: Callable[[Path, Common.ItemType], None],
+    context: Any,
+    status: ExecuteTasks.Status,  # pylint: disable=unused-argument
+) -> None:
+    fullpath = cast(Path, context)
+    del context
+
+    item_type = destination_data_store.GetItemType(fullpath)
+
+    if item_type is not None:
+        commit_func(fullpath, item_type)
+
+
+# ----------------------------------------------------------------------
+def _GetLeafNodes(
+    root: Snapshot.Node,
+) -> list[Snapshot.Node]:
+    """Returns every file and empty directory within the tree"""
+
+    return [node for node in root.Enum() if node.is_file or not node.children]
+
+
+# ----------------------------------------------------------------------
+def _CreateFileSizeLookup(
+    nodes: list[Snapshot.Node],
+    paths: Optional[list[Path]] = None,
+) -> dict[Path, Optional[int]]:
+    """Returns the size of every file (or None for every empty directory)"""
+
+    if paths is None:
+        paths = [node.fullpath for node in nodes]
+
+    return dict(zip(paths, (node.file_size for node in nodes)))
+
+
+# ----------------------------------------------------------------------
+def _CreateDestinationNode(
+    nodes: list[Snapshot.Node],
+    paths: list[Path],
+) -> Snapshot.Node:
+    new_root = Snapshot.Node(None, None, Common.DirHashPlaceholder(explicitly_added=False), None)
+
+    for node, destination_path in zip(nodes, paths):
+        if node.is_dir:
+            new_root.AddDir(destination_path, force=True)
+        elif node.is_file:
+            new_root.AddFile(
+                destination_path,
+                cast(str, node.hash_value),
+                cast(int, node.file_size),
+            )
+        else:
+            assert False, node  # pragma: no cover
+
+    return new_root
+
+
 # ----------------------------------------------------------------------
 def _CleanupImpl(
     dm: DoneManager,
@@ -541,6 +607,9 @@ def _CleanupImpl(
         if item_type != Common.ItemType.Dir:
             raise Exception(f"'{CONTENT_DIR_NAME}' is not a valid directory.")
 
+        pending_commit_extension = Common.PENDING_COMMIT_EXTENSION
+        pending_delete_extension = Common.PENDING_DELETE_EXTENSION
+
         for root, directories, filenames in data_store.Walk():
             if clean_dm.capabilities.is_interactive:
                 clean_dm.WriteStatus(f"Processing '{root}'...")
@@ -551,13 +620,14 @@ def _CleanupImpl(
             ]:
                 for item in items:
                     fullpath = root / item
+                    suffix = fullpath.suffix
 
-                    if fullpath.suffix == Common.PENDING_COMMIT_EXTENSION:
+                    if suffix == pending_commit_extension:
                         with clean_dm.Nested(f"Removing '{fullpath}'..."):
                             remove_func(fullpath)
                             items_reverted += 1
 
-                    elif fullpath.suffix == Common.PENDING_DELETE_EXTENSION:
+                    elif suffix == pending_delete_extension:
                         original_filename = fullpath.with_suffix("")
 
                         with clean_dm.Nested(f"Restoring '{original_filename}'..."):
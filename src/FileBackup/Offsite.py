@@ -17,16 +17,22 @@ deltas are applied to that snapshot for subsequent backups.
 """
 
 import datetime
+import errno
+import hashlib
 import itertools
 import json
+import mmap
 import os
 import re
 import shutil
+import stat
 import sys
+import tempfile
 import textwrap
 import threading
 import uuid
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import auto, Enum
@@ -70,6 +76,7 @@ class SnapshotFilenames:
     backup_name: str
     standard: Path
     pending: Path
+    hash_cache: Path
 
     # ----------------------------------------------------------------------
     @classmethod
@@ -84,9 +91,35 @@ class SnapshotFilenames:
             snapshot_filename,
             snapshot_filename.parent
             / f"{snapshot_filename.stem}.__pending__{snapshot_filename.suffix}",
+            snapshot_filename.parent
+            / f"{snapshot_filename.stem}.hashcache{snapshot_filename.suffix}",
         )
 
 
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+_DIRECTORY_NAME_REGEX = re.compile(
+    textwrap.dedent(
+        r"""(?#
+        Year                )(?P<year>\d{{4}})(?#
+        Month               )\.(?P<month>\d{{2}})(?#
+        Day                 )\.(?P<day>\d{{2}})(?#
+        Hour                )\.(?P<hour>\d{{2}})(?#
+        Minute              )\.(?P<minute>\d{{2}})(?#
+        Second              )\.(?P<second>\d{{2}})(?#
+        Index               )-(?P<index>\d+)(?#
+        Suffix              )(?P<suffix>{})?(?#
+        )""",
+    ).format(re.escape(DELTA_SUFFIX)),
+)
+
+_JSON_WHITESPACE_REGEX = re.compile(r"[ \t\r\n]*")
+_JSON_READ_SIZE = 1024 * 1024
+
+
 # ----------------------------------------------------------------------
 # |
 # |  Public Functions
@@ -109,6 +142,8 @@ def Backup(
     archive_volume_size: int = DEFAULT_ARCHIVE_VOLUME_SIZE,
     ignore_pending_snapshot: bool = False,
     commit_pending_snapshot: bool = True,
+    validate_archive: bool = True,
+    use_hash_cache: bool = False,
 ) -> None:
     # Process the inputs
     for input_filename_or_dir in input_filenames_or_dirs:
@@ -152,6 +187,17 @@ def Backup(
         return
 
     # Create the local snapshot
+    hash_cache: Snapshot.HashCache | None = None
+
+    if use_hash_cache:
+        # Files whose size and modification time haven't changed since the previous backup will use
+        # the previously calculated hash value. Hash values are recalculated when forcing a backup.
+        hash_cache = (
+            Snapshot.HashCache()
+            if force
+            else Snapshot.HashCache.Load(snapshot_filenames.hash_cache)
+        )
+
     with dm.Nested("Creating the local snapshot...") as local_dm:
         local_snapshot = Snapshot.Calculate(
             local_dm,
@@ -160,11 +206,19 @@ def Backup(
             run_in_parallel=ssd,
             quiet=quiet,
             filter_filename_func=Common.CreateFilterFunc(file_includes, file_excludes),
+            hash_cache=hash_cache,
         )
 
         if local_dm.result != 0:
             return
 
+    # ----------------------------------------------------------------------
+    def PersistHashCache() -> None:
+        if hash_cache is not None:
+            hash_cache.Persist(snapshot_filenames.hash_cache)
+
+    # ----------------------------------------------------------------------
+
     if force or not snapshot_filenames.standard.is_file():
         force = True
 
@@ -195,6 +249,7 @@ def Backup(
     )
 
     if not any(diff_items for diff_items in diffs.values()):
+        PersistHashCache()
         return
 
     # Capture all of the changes in a temp directory
@@ -264,32 +319,52 @@ def Backup(
             if diffs[Common.DiffOperation.add] or diffs[Common.DiffOperation.modify]:
                 # Create a lookup for the hash values of all existing files at the offsite.
                 # We will use this information to only copy those files that do not already
-                # exist at the offsite.
-                offsite_file_lookup: set[str] = set()
-
-                for node in offsite_snapshot.node.Enum():
-                    if not node.is_file:
-                        continue
+                # exist at the offsite. The hex hash values are stored as their binary digests,
+                # which is half the size of the hex string (this set can be very large).
+                offsite_file_lookup: set[bytes] = {
+                    bytes.fromhex(cast(str, node.hash_value))
+                    for node in offsite_snapshot.node.Enum()
+                    if node.is_file
+                }
+
+                # Gather all the diffs associated with the files that need to be transferred. The
+                # file system probes are I/O-bound, so issue them concurrently on an SSD; the sizes
+                # are cached so that the files don't need to be stat'd again when they are
+                # preserved.
+                candidate_diffs = list(
+                    itertools.chain(
+                        diffs[Common.DiffOperation.add],
+                        diffs[Common.DiffOperation.modify],
+                    ),
+                )
 
-                    assert isinstance(node.hash_value, str), node.hash_value
-                    offsite_file_lookup.add(node.hash_value)
+                with ThreadPoolExecutor(max_workers=None if ssd else 1) as executor:
+                    file_sizes = list(
+                        executor.map(lambda diff: _GetFileSize(diff.path), candidate_diffs),
+                    )
 
-                # Gather all the diffs associated with the files that need to be transferred
                 diffs_to_process: list[Common.DiffResult] = []
+                file_size_lookup: dict[Path, int] = {}
 
-                for diff in itertools.chain(
-                    diffs[Common.DiffOperation.add],
-                    diffs[Common.DiffOperation.modify],
-                ):
-                    if not diff.path.is_file():
+                # Bind the methods invoked for every diff to locals, as this loop may process
+                # millions of items.
+                from_hex = bytes.fromhex
+                add_diff_to_process = diffs_to_process.append
+                add_offsite_hash = offsite_file_lookup.add
+
+                for diff, file_size in zip(candidate_diffs, file_sizes):
+                    if file_size is None:
                         continue
 
                     assert isinstance(diff.this_hash, str), diff.this_hash
-                    if diff.this_hash in offsite_file_lookup:
+                    hash_digest = from_hex(diff.this_hash)
+
+                    if hash_digest in offsite_file_lookup:
                         continue
 
-                    diffs_to_process.append(diff)
-                    offsite_file_lookup.add(diff.this_hash)
+                    add_diff_to_process(diff)
+                    file_size_lookup[diff.path] = file_size
+                    add_offsite_hash(hash_digest)
 
                 if diffs_to_process:
                     # Calculate the size requirements
@@ -303,6 +378,14 @@ def Backup(
                     if prepare_dm.result != 0:
                         return
 
+                    # Create the directories used to store the files once rather than attempting
+                    # to create them for every file.
+                    for prefix_dir in {
+                        Path(cast(str, diff.this_hash)[:2]) / cast(str, diff.this_hash)[2:4]
+                        for diff in diffs_to_process
+                    }:
+                        file_content_data_store.MakeDirs(prefix_dir)
+
                     # Preserve the files
                     with prepare_dm.Nested("\nPreserving files...") as preserve_dm:
                         # ----------------------------------------------------------------------
@@ -327,24 +410,33 @@ def Backup(
                                     Path(diff.this_hash[:2]) / diff.this_hash[2:4] / diff.this_hash
                                 )
 
-                                Common.WriteFile(
-                                    file_content_data_store,
-                                    diff.path,
-                                    dest_filename,
-                                    lambda bytes_written: cast(
-                                        None, status.OnProgress(bytes_written, None)
-                                    ),
-                                )
+                                # The content is stored by hash value, so ensure that the content
+                                # written is the content that was hashed.
+                                try:
+                                    Common.WriteFile(
+                                        file_content_data_store,
+                                        diff.path,
+                                        dest_filename,
+                                        lambda bytes_written: cast(
+                                            None, status.OnProgress(bytes_written, None)
+                                        ),
+                                        expected_hash=diff.this_hash,
+                                        make_dirs=False,
+                                    )
+                                except:
+                                    # The cached hash value may be the reason for the mismatch
+                                    # (e.g. the content changed without changing the fingerprint),
+                                    # so ensure that it isn't used again.
+                                    if hash_cache is not None:
+                                        hash_cache.RemoveHash(diff.path)
+
+                                    raise
 
                                 return dest_filename
 
                             # ----------------------------------------------------------------------
 
-                            content_size = 0
-                            if diff.path.is_file():
-                                content_size = diff.path.stat().st_size
-
-                            return content_size, TransformTask
+                            return file_size_lookup[diff.path], TransformTask
 
                         # ----------------------------------------------------------------------
 
@@ -364,6 +456,9 @@ def Backup(
                         )
 
                         if preserve_dm.result != 0:
+                            # Persist the cache so that the hash values removed above aren't used
+                            # by the next backup.
+                            PersistHashCache()
                             return
 
             with prepare_dm.Nested(
@@ -372,25 +467,49 @@ def Backup(
             ):
                 index_filename_path = Path(INDEX_FILENAME)
 
-                with file_content_data_store.Open(index_filename_path, "w") as f:
-                    json_diffs: list[dict[str, Any]] = []
+                # Write the diffs one at a time rather than creating (potentially) millions of
+                # json objects in memory before serializing them. The content is hashed as it is
+                # written (using the same algorithm as Common.CalculateHash) so that the file
+                # doesn't need to be read again.
+                hasher = hashlib.sha512()
+
+                with file_content_data_store.Open(index_filename_path, "wb") as f:
+                    # ----------------------------------------------------------------------
+                    def Write(
+                        content: str,
+                    ) -> None:
+                        content_bytes = content.encode("UTF-8")
+
+                        f.write(content_bytes)
+                        hasher.update(content_bytes)
+
+                    # ----------------------------------------------------------------------
+
+                    # json.dumps creates a new encoder for every call when non-default arguments
+                    # are provided; create one and reuse it.
+                    encode_func = json.JSONEncoder(separators=(",", ":")).encode
+
+                    Write("[")
+
+                    is_first = True
 
                     for these_diffs in diffs.values():
                         these_diffs.sort(key=lambda value: str(value.path))
 
                         for diff in these_diffs:
-                            json_diffs.append(diff.ToJson())
+                            content = encode_func(diff.ToJson())
+
+                            if is_first:
+                                is_first = False
+                            else:
+                                content = "," + content
+
+                            Write(content)
 
-                    json.dump(json_diffs, f)
+                    Write("]")
 
                 with file_content_data_store.Open(Path(INDEX_HASH_FILENAME), "w") as f:
-                    f.write(
-                        Common.CalculateHash(
-                            file_content_data_store,
-                            index_filename_path,
-                            lambda _: None,
-                        ),
-                    )
+                    f.write(hasher.hexdigest())
 
             if encryption_password and compress:
                 heading = "Compressing and encrypting..."
@@ -416,7 +535,7 @@ def Backup(
                 ) as zip_dm:
                     assert zip_binary is not None
 
-                    command_line = f'{zip_binary} a -t7z -mx{compression_level} -ms=on -mhe=on -sccUTF-8 -scsUTF-8 -ssw -v{archive_volume_size} "{ARCHIVE_FILENAME}" {encryption_arg}'
+                    command_line = f'{zip_binary} a -t7z -mx{compression_level} -ms=on -mmt=on -mhe=on -sccUTF-8 -scsUTF-8 -ssw -v{archive_volume_size} "{ARCHIVE_FILENAME}" {encryption_arg}'
 
                     zip_dm.WriteVerbose(f"Command Line: {_ScrubZipCommandLine(command_line)}\n\n")
 
@@ -430,36 +549,42 @@ def Backup(
                         if zip_dm.result != 0:
                             return
 
-                with prepare_dm.Nested(
-                    "Validating archive...",
-                    suffix="\n",
-                ) as validate_dm:
-                    assert zip_binary is not None
+                if validate_archive:
+                    with prepare_dm.Nested(
+                        "Validating archive...",
+                        suffix="\n",
+                    ) as validate_dm:
+                        assert zip_binary is not None
 
-                    command_line = f'{zip_binary} t "{file_content_root / ARCHIVE_FILENAME}.001"{encryption_arg}'
+                        command_line = f'{zip_binary} t -mmt=on "{file_content_root / ARCHIVE_FILENAME}.001"{encryption_arg}'
 
-                    validate_dm.WriteVerbose(
-                        f"Command Line: {_ScrubZipCommandLine(command_line)}\n\n"
-                    )
+                        validate_dm.WriteVerbose(
+                            f"Command Line: {_ScrubZipCommandLine(command_line)}\n\n"
+                        )
 
-                    with validate_dm.YieldStream() as stream:
-                        validate_dm.result = SubprocessEx.Stream(command_line, stream)
+                        with validate_dm.YieldStream() as stream:
+                            validate_dm.result = SubprocessEx.Stream(command_line, stream)
 
-                        if validate_dm.result != 0:
-                            return
+                            if validate_dm.result != 0:
+                                return
 
                 with prepare_dm.Nested("Cleaning content...") as clean_dm:
-                    for item in file_content_root.iterdir():
-                        if item.name.startswith(ARCHIVE_FILENAME):
-                            continue
-
-                        with clean_dm.VerboseNested(f"Removing '{item}'..."):
-                            if item.is_file():
-                                item.unlink()
-                            elif item.is_dir():
-                                shutil.rmtree(item)
-                            else:
-                                assert False, item  # pragma: no cover
+                    # Use scandir so that the item types are (typically) available without
+                    # additional stat calls.
+                    with os.scandir(file_content_root) as entries:
+                        for entry in entries:
+                            if entry.name.startswith(ARCHIVE_FILENAME):
+                                continue
+
+                            item = Path(entry.path)
+
+                            with clean_dm.VerboseNested(f"Removing '{item}'..."):
+                                if entry.is_file():
+                                    item.unlink()
+                                elif entry.is_dir():
+                                    shutil.rmtree(item)
+                                else:
+                                    assert False, item  # pragma: no cover
 
         if not destination:
             with dm.Nested("Preserving the pending snapshot...") as pending_dm:
@@ -472,6 +597,7 @@ def Backup(
                 if pending_dm.result != 0:
                     return
 
+            PersistHashCache()
             return
 
         with Common.YieldDataStore(
@@ -500,6 +626,8 @@ def Backup(
             if dm.result != 0:
                 return
 
+            PersistHashCache()
+
             if commit_pending_snapshot:
                 with dm.Nested("Committing snapshot locally...") as commit_dm:
                     local_snapshot.Persist(
@@ -521,8 +649,9 @@ def Commit(
         return
 
     with dm.Nested(f"Committing the pending snapshot for the backup '{backup_name}'..."):
-        snapshot_filenames.standard.unlink(missing_ok=True)
-        shutil.move(snapshot_filenames.pending, snapshot_filenames.standard)
+        # The files are in the same directory, so this is an atomic rename that replaces any
+        # existing snapshot.
+        os.replace(snapshot_filenames.pending, snapshot_filenames.standard)
 
 
 # ----------------------------------------------------------------------
@@ -621,23 +750,8 @@ def Restore(
                         )
                         return
 
-                    dir_regex = re.compile(
-                        textwrap.dedent(
-                            r"""(?#
-                            Year                )(?P<year>\d{{4}})(?#
-                            Month               )\.(?P<month>\d{{2}})(?#
-                            Day                 )\.(?P<day>\d{{2}})(?#
-                            Hour                )\.(?P<hour>\d{{2}})(?#
-                            Minute              )\.(?P<minute>\d{{2}})(?#
-                            Second              )\.(?P<second>\d{{2}})(?#
-                            Index               )-(?P<index>\d+)(?#
-                            Suffix              )(?P<suffix>{})?(?#
-                            )""",
-                        ).format(re.escape(DELTA_SUFFIX)),
-                    )
-
                     for directory in directories:
-                        match = dir_regex.match(directory)
+                        match = _DIRECTORY_NAME_REGEX.match(directory)
                         if not match:
                             preprocess_dm.WriteError(
                                 f"'{directory}' is not a recognized directory name.\n"
@@ -752,6 +866,7 @@ def Restore(
                                 _VerifyRestoredFiles(
                                     directory,
                                     contents_dir,
+                                    ssd,
                                     lambda message: cast(
                                         None,
                                         status.OnProgress(
@@ -786,8 +901,12 @@ def Restore(
                                     destination_dir.name + "__temp__"
                                 )
 
-                                shutil.rmtree(temp_dest_dir, ignore_errors=True)
-                                temp_dest_dir.mkdir(parents=True)
+                                try:
+                                    temp_dest_dir.mkdir(parents=True)
+                                except FileExistsError:
+                                    # Remnants of an interrupted restore
+                                    shutil.rmtree(temp_dest_dir, ignore_errors=True)
+                                    temp_dest_dir.mkdir(parents=True)
 
                                 items = [
                                     item
@@ -842,18 +961,21 @@ def Restore(
                     ) -> Path:
                         return staging_directory / hash_value[:2] / hash_value[2:4] / hash_value
 
+                    substitute_func = _CreateSubstituteFunc(dir_substitutions)
+
                     # ----------------------------------------------------------------------
                     def PathToFilename(
                         path: str,
                     ) -> Path:
-                        for source_text, dest_text in dir_substitutions.items():
-                            path = path.replace(source_text, dest_text)
-
-                        return Path(path)
+                        return Path(substitute_func(path))
 
                     # ----------------------------------------------------------------------
 
-                    file_hashes: set[str] = set()
+                    # Store the raw digests rather than the hex strings, as this set may contain
+                    # millions of items.
+                    file_hashes: set[bytes] = set()
+
+                    staging_device = staging_directory.stat().st_dev
 
                     for index, (directory, directory_working_dir) in enumerate(
                         zip(directories, directory_working_dirs)
@@ -869,33 +991,52 @@ def Restore(
                             ),
                         ):
                             # link the content
-                            for root_str, _, filenames in os.walk(
+                            links: list[tuple[Path, Path]] = []
+
+                            for entry in _YieldFileEntries(
                                 directory_working_dir,
-                                followlinks=True,
+                                include_root_files=False,
+                                follow_symlinks=True,
                             ):
-                                root = Path(root_str)
+                                fullpath = Path(entry.path)
 
-                                if root == directory_working_dir:
-                                    continue
+                                links.append(
+                                    (
+                                        fullpath,
+                                        staging_directory
+                                        / fullpath.relative_to(directory_working_dir),
+                                    ),
+                                )
 
-                                for filename in filenames:
-                                    fullpath = root / filename
+                            for parent in sorted({dest.parent for _, dest in links}):
+                                parent.mkdir(parents=True, exist_ok=True)
 
-                                    dest_filename = staging_directory / fullpath.relative_to(
-                                        directory_working_dir
-                                    )
-
-                                    dest_filename.parent.mkdir(parents=True, exist_ok=True)
+                            # Hard links don't need to be dereferenced when the content is read,
+                            # but are only possible when the content is on the same device.
+                            link_func: Callable[[Path, Path], None] = (
+                                _LinkFile
+                                if directory_working_dir.stat().st_dev == staging_device
+                                else os.symlink
+                            )
 
-                                    os.symlink(fullpath, dest_filename)
+                            # Creating a link is a blocking call whose latency dominates on
+                            # network file systems, so overlap the calls when possible.
+                            if ssd and data_store.ExecuteInParallel():
+                                with ThreadPoolExecutor() as executor:
+                                    for _ in executor.map(lambda link: link_func(*link), links):
+                                        pass
+                            else:
+                                for fullpath, dest_filename in links:
+                                    link_func(fullpath, dest_filename)
 
-                            # Read the instructions
-                            with (directory_working_dir / INDEX_FILENAME).open() as f:
-                                json_content = json.load(f)
+                            # Read the instructions; the index is parsed incrementally, as it
+                            # may contain millions of items.
 
                             # TODO: Validate json against a schema
 
-                            for item_index, item in enumerate(json_content):
+                            for item_index, item in enumerate(
+                                _YieldJsonArrayItems(directory_working_dir / INDEX_FILENAME),
+                            ):
                                 try:
                                     assert "operation" in item, item
 
@@ -907,7 +1048,7 @@ def Restore(
                                             hash_filename = None
                                         else:
                                             hash_filename = HashToFilename(hash_value)
-                                            file_hashes.add(hash_value)
+                                            file_hashes.add(bytes.fromhex(hash_value))
 
                                         these_instructions.append(
                                             Instruction(
@@ -919,13 +1060,13 @@ def Restore(
                                         )
 
                                     elif item["operation"] == "modify":
-                                        if item["other_hash"] not in file_hashes:
+                                        if bytes.fromhex(item["other_hash"]) not in file_hashes:
                                             raise Exception(
                                                 "The original file does not exist in the staged content."
                                             )
 
                                         new_hash_filename = HashToFilename(item["this_hash"])
-                                        file_hashes.add(item["this_hash"])
+                                        file_hashes.add(bytes.fromhex(item["this_hash"]))
 
                                         these_instructions.append(
                                             Instruction(
@@ -940,7 +1081,7 @@ def Restore(
                                         hash_value = item.get("other_hash", None)
 
                                         if hash_value is not None:
-                                            if item["other_hash"] not in file_hashes:
+                                            if bytes.fromhex(hash_value) not in file_hashes:
                                                 raise Exception(
                                                     "The referenced file does not exist in the staged content."
                                                 )
@@ -978,166 +1119,295 @@ def Restore(
                         assert these_instructions
                         instructions[directory] = these_instructions
 
-            with dm.Nested("\nProcessing instructions...") as all_instructions_dm:
-                all_instructions_dm.WriteLine("")
+            # Content is copied to staging directories before anything is committed so that errors
+            # (e.g. insufficient disk space) are encountered before any local content is modified. A
+            # staging directory is created on each device written to so that the content can be
+            # committed with a rename rather than a second copy. The staging directories can't be
+            # created within any item that is removed or replaced when the content is committed.
+            staging_dirs: dict[int, Path] = {}
+            staging_devices: dict[Path, int] = {}
 
-                temp_directory = PathEx.CreateTempDirectory()
+            # The staging directories are unique, so a counter is sufficient to name the content
+            # within them.
+            staged_file_counter = itertools.count()
 
-                with ExitStack(lambda: shutil.rmtree(temp_directory)):
-                    commit_actions: list[Callable[[], None]] = []
+            committed_paths: set[Path] = {
+                instruction.local_filename
+                for these_instructions in instructions.values()
+                for instruction in these_instructions
+            }
 
-                    # ----------------------------------------------------------------------
-                    def WriteImpl(
-                        local_filename: Path,
-                        content_filename: Path | None,
-                    ) -> None:
-                        if content_filename is None:
-                            # ----------------------------------------------------------------------
-                            def CommitDir() -> None:
-                                if local_filename.is_dir():
-                                    shutil.rmtree(local_filename)
-                                else:
-                                    local_filename.unlink(missing_ok=True)
-
-                                local_filename.mkdir(parents=True)
-
-                            # ----------------------------------------------------------------------
+            # ----------------------------------------------------------------------
+            def RemoveStagingDirs() -> None:
+                for staging_dir in staging_dirs.values():
+                    shutil.rmtree(staging_dir, ignore_errors=True)
 
-                            commit_actions.append(CommitDir)
-                            return
+            # ----------------------------------------------------------------------
 
-                        temp_filename = temp_directory / str(uuid.uuid4())
+            with (
+                dm.Nested("\nProcessing instructions...") as all_instructions_dm,
+                ExitStack(RemoveStagingDirs),
+            ):
+                all_instructions_dm.WriteLine("")
 
-                        with content_filename.resolve().open("rb") as source:
-                            with temp_filename.open("wb") as dest:
-                                dest.write(source.read())
+                commit_actions: list[
+                    tuple[
+                        Path,  # The local item modified by the action
+                        Callable[[], None],
+                    ]
+                ] = []
 
+                # ----------------------------------------------------------------------
+                def WriteImpl(
+                    local_filename: Path,
+                    content_filename: Path | None,
+                ) -> None:
+                    if content_filename is None:
                         # ----------------------------------------------------------------------
-                        def CommitFile() -> None:
+                        def CommitDir() -> None:
                             if local_filename.is_dir():
                                 shutil.rmtree(local_filename)
-                            elif local_filename.is_file():
-                                local_filename.unlink()
+                            else:
+                                local_filename.unlink(missing_ok=True)
 
-                            local_filename.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.move(temp_filename, local_filename)
+                            local_filename.mkdir(parents=True)
 
                         # ----------------------------------------------------------------------
 
-                        commit_actions.append(CommitFile)
+                        commit_actions.append((local_filename, CommitDir))
+                        return
 
-                    # ----------------------------------------------------------------------
-                    def OnAddInstruction(
-                        dm: DoneManager,
-                        instruction: Instruction,
-                    ) -> None:
-                        if instruction.local_filename.exists() and not overwrite:
-                            dm.WriteError(
-                                f"The local item '{instruction.local_filename}' exists and will not be overwritten.\n",
-                            )
-                            return
+                    temp_filename = GetStagingDir(local_filename) / str(next(staged_file_counter))
 
-                        WriteImpl(instruction.local_filename, instruction.file_content_path)
+                    # shutil.copyfile streams the content (using os.sendfile where available)
+                    # rather than reading the entire file into memory; it also follows the staged
+                    # symlinks, so the path doesn't need to be resolved.
+                    shutil.copyfile(content_filename, temp_filename)
 
                     # ----------------------------------------------------------------------
-                    def OnModifyInstruction(
-                        dm: DoneManager,  # pylint: disable=unused-argument
-                        instruction: Instruction,
-                    ) -> None:
-                        assert instruction.file_content_path is not None
-                        WriteImpl(instruction.local_filename, instruction.file_content_path)
+                    def CommitFile() -> None:
+                        if local_filename.is_dir():
+                            shutil.rmtree(local_filename)
 
-                    # ----------------------------------------------------------------------
-                    def OnRemoveInstruction(
-                        dm: DoneManager,  # pylint: disable=unused-argument
-                        instruction: Instruction,
-                    ) -> None:
-                        # ----------------------------------------------------------------------
-                        def RemoveItem():
-                            if instruction.local_filename.is_file():
-                                instruction.local_filename.unlink()
-                            elif instruction.local_filename.is_dir():
-                                shutil.rmtree(instruction.local_filename)
+                        local_filename.parent.mkdir(parents=True, exist_ok=True)
 
-                        # ----------------------------------------------------------------------
+                        try:
+                            os.replace(temp_filename, local_filename)
+                        except OSError as ex:
+                            if ex.errno != errno.EXDEV:
+                                raise
 
-                        commit_actions.append(RemoveItem)
+                            # The staging directory is on a different device
+                            local_filename.unlink(missing_ok=True)
+                            shutil.move(temp_filename, local_filename)
 
                     # ----------------------------------------------------------------------
 
-                    operation_map: dict[
-                        Common.DiffOperation,
-                        tuple[
-                            str,  # Heading prefix
-                            Callable[[DoneManager, Instruction], None],
-                        ],
-                    ] = {
-                        Common.DiffOperation.add: ("Restoring", OnAddInstruction),
-                        Common.DiffOperation.modify: ("Updating", OnModifyInstruction),
-                        Common.DiffOperation.remove: ("Removing", OnRemoveInstruction),
-                    }
-
-                    for directory_index, (directory, these_instructions) in enumerate(
-                        instructions.items()
+                    commit_actions.append((local_filename, CommitFile))
+
+                # ----------------------------------------------------------------------
+                def GetStagingDir(
+                    local_filename: Path,
+                ) -> Path:
+                    # The nearest existing ancestor determines the device that will be written to
+                    ancestor = local_filename.parent
+                    while not DirectoryExists(ancestor):
+                        ancestor = ancestor.parent
+
+                    for parent in [ancestor, *ancestor.parents]:
+                        if parent in committed_paths:
+                            ancestor = parent.parent
+
+                    device = staging_devices.get(ancestor, None)
+                    if device is None:
+                        device = ancestor.stat().st_dev
+                        staging_devices[ancestor] = device
+
+                    staging_dir = staging_dirs.get(device, None)
+                    if staging_dir is None:
+                        try:
+                            staging_dir = Path(
+                                tempfile.mkdtemp(prefix=".FileBackupRestore.", dir=ancestor)
+                            )
+                        except OSError:
+                            # The content will be copied again when it is committed
+                            staging_dir = PathEx.CreateTempDirectory()
+
+                        staging_dirs[device] = staging_dir
+
+                    return staging_dir
+
+                # Restores commonly target directories that don't exist yet; caching the
+                # directories' existence allows those items to be checked without a stat call
+                # per item.
+                directory_exists_cache: dict[Path, bool] = {}
+
+                # ----------------------------------------------------------------------
+                def DirectoryExists(
+                    path: Path,
+                ) -> bool:
+                    result = directory_exists_cache.get(path, None)
+                    if result is None:
+                        if path.parent != path and not DirectoryExists(path.parent):
+                            result = False
+                        else:
+                            result = path.is_dir()
+
+                        directory_exists_cache[path] = result
+
+                    return result
+
+                # ----------------------------------------------------------------------
+                def OnAddInstruction(
+                    dm: DoneManager,
+                    instruction: Instruction,
+                ) -> None:
+                    if (
+                        not overwrite
+                        and DirectoryExists(instruction.local_filename.parent)
+                        and instruction.local_filename.exists()
                     ):
-                        with all_instructions_dm.Nested(
-                            f"Processing '{directory}' ({directory_index + 1} of {len(instructions)})...",
-                            suffix="\n",
-                        ) as instructions_dm:
-                            with instructions_dm.YieldStream() as stream:
-                                stream.write(
-                                    textwrap.dedent(
-                                        """\
-
-                                        {}
-                                        """,
-                                    ).format(
-                                        TextwrapEx.CreateTable(
-                                            [
-                                                "Operation",
-                                                "Local Location",
-                                                "Original Location",
-                                            ],
-                                            [
-                                                [
-                                                    f"[{instruction.operation.name.upper()}]",
-                                                    str(instruction.local_filename),
-                                                    instruction.original_filename,
-                                                ]
-                                                for instruction in these_instructions
-                                            ],
+                        dm.WriteError(
+                            f"The local item '{instruction.local_filename}' exists and will not be overwritten.\n",
+                        )
+                        return
+
+                    WriteImpl(instruction.local_filename, instruction.file_content_path)
+
+                # ----------------------------------------------------------------------
+                def OnModifyInstruction(
+                    dm: DoneManager,  # pylint: disable=unused-argument
+                    instruction: Instruction,
+                ) -> None:
+                    assert instruction.file_content_path is not None
+                    WriteImpl(instruction.local_filename, instruction.file_content_path)
+
+                # ----------------------------------------------------------------------
+                def OnRemoveInstruction(
+                    dm: DoneManager,  # pylint: disable=unused-argument
+                    instruction: Instruction,
+                ) -> None:
+                    # ----------------------------------------------------------------------
+                    def RemoveItem():
+                        if instruction.local_filename.is_file():
+                            instruction.local_filename.unlink()
+                        elif instruction.local_filename.is_dir():
+                            shutil.rmtree(instruction.local_filename)
+
+                    # ----------------------------------------------------------------------
+
+                    commit_actions.append((instruction.local_filename, RemoveItem))
+
+                # ----------------------------------------------------------------------
+
+                operation_map: dict[
+                    Common.DiffOperation,
+                    tuple[
+                        str,  # Heading prefix
+                        Callable[[DoneManager, Instruction], None],
+                    ],
+                ] = {
+                    Common.DiffOperation.add: ("Restoring", OnAddInstruction),
+                    Common.DiffOperation.modify: ("Updating", OnModifyInstruction),
+                    Common.DiffOperation.remove: ("Removing", OnRemoveInstruction),
+                }
+
+                for directory_index, (directory, these_instructions) in enumerate(
+                    instructions.items()
+                ):
+                    with all_instructions_dm.Nested(
+                        f"Processing '{directory}' ({directory_index + 1} of {len(instructions)})...",
+                        suffix="\n",
+                    ) as instructions_dm:
+                        with instructions_dm.YieldStream() as stream:
+                            stream.write(
+                                textwrap.dedent(
+                                    """\
+
+                                    {}
+                                    """,
+                                ).format(
+                                    TextwrapEx.CreateTable(
+                                        [
+                                            "Operation",
+                                            "Local Location",
+                                            "Original Location",
+                                        ],
+                                        [
                                             [
-                                                TextwrapEx.Justify.Center,
-                                                TextwrapEx.Justify.Left,
-                                                TextwrapEx.Justify.Left,
-                                            ],
-                                        ),
+                                                f"[{instruction.operation.name.upper()}]",
+                                                str(instruction.local_filename),
+                                                instruction.original_filename,
+                                            ]
+                                            for instruction in these_instructions
+                                        ],
+                                        [
+                                            TextwrapEx.Justify.Center,
+                                            TextwrapEx.Justify.Left,
+                                            TextwrapEx.Justify.Left,
+                                        ],
                                     ),
-                                )
+                                ),
+                            )
 
-                            if not dry_run:
-                                for instruction_index, instruction in enumerate(these_instructions):
-                                    prefix, on_instruction_func = operation_map[
-                                        instruction.operation
-                                    ]
+                        if not dry_run:
+                            for instruction_index, instruction in enumerate(these_instructions):
+                                prefix, on_instruction_func = operation_map[instruction.operation]
 
-                                    with instructions_dm.Nested(
-                                        f"{prefix} the {'file' if instruction.file_content_path is not None else 'directory'} '{instruction.local_filename}' ({instruction_index + 1} of {len(these_instructions)})...",
-                                    ) as execute_dm:
-                                        on_instruction_func(execute_dm, instruction)
+                                with instructions_dm.Nested(
+                                    f"{prefix} the {'file' if instruction.file_content_path is not None else 'directory'} '{instruction.local_filename}' ({instruction_index + 1} of {len(these_instructions)})...",
+                                ) as execute_dm:
+                                    on_instruction_func(execute_dm, instruction)
 
-                                        if execute_dm.result != 0:
-                                            break
+                                    if execute_dm.result != 0:
+                                        break
+
+                            instructions_dm.WriteLine("")
+
+                        if instructions_dm.result != 0:
+                            break
+
+                # Commit
+                with all_instructions_dm.Nested("Committing content..."):
+                    if not commit_actions:
+                        return
 
-                                instructions_dm.WriteLine("")
+                    # Actions are independent unless one item is an ancestor of (or the same
+                    # as) another. Grouping actions by the path components shared at the
+                    # shallowest depth places all related actions in the same group, where they
+                    # are invoked in their original order; the groups are invoked concurrently.
+                    depth = min(len(local_path.parts) for local_path, _ in commit_actions)
 
-                            if instructions_dm.result != 0:
-                                break
+                    groups: dict[tuple[str, ...], list[Callable[[], None]]] = {}
 
-                    # Commit
-                    with all_instructions_dm.Nested("Committing content..."):
-                        for commit_action in commit_actions:
-                            commit_action()
+                    for local_path, commit_action in commit_actions:
+                        groups.setdefault(local_path.parts[:depth], []).append(commit_action)
+
+                    commit_failed = threading.Event()
+
+                    # ----------------------------------------------------------------------
+                    def CommitGroup(
+                        group_actions: list[Callable[[], None]],
+                    ) -> None:
+                        for group_action in group_actions:
+                            # Stop committing once any group has failed so that as little content
+                            # as possible is partially committed.
+                            if commit_failed.is_set():
+                                return
+
+                            try:
+                                group_action()
+                            except:
+                                commit_failed.set()
+                                raise
+
+                    # ----------------------------------------------------------------------
+
+                    with ThreadPoolExecutor(
+                        max_workers=None if ssd and data_store.ExecuteInParallel() else 1,
+                    ) as executor:
+                        for _ in executor.map(CommitGroup, groups.values()):
+                            pass
 
 
 # ----------------------------------------------------------------------
@@ -1175,6 +1445,241 @@ def _GetZipBinary() -> str:
     return _get_zip_binary_result
 
 
+# ----------------------------------------------------------------------
+def _CreateSubstituteFunc(
+    substitutions: dict[str, str],
+) -> Callable[[str], str]:
+    """Returns a function that applies the substitutions (in order) to a string"""
+
+    if not substitutions:
+        return lambda value: value
+
+    # ----------------------------------------------------------------------
+    def SubstituteSequentially(
+        value: str,
+    ) -> str:
+        for source_text, dest_text in substitutions.items():
+            value = value.replace(source_text, dest_text)
+
+        return value
+
+    # ----------------------------------------------------------------------
+
+    if len(substitutions) == 1:
+        return SubstituteSequentially
+
+    # A single pass with a regex alternation produces the same results as applying the
+    # substitutions in order only when they can't interact with each other: no two sources may
+    # overlap and no replacement may (in combination with the surrounding text) form another source.
+    for source_text, dest_text in substitutions.items():
+        for other_source_text in substitutions:
+            if other_source_text == source_text:
+                continue
+
+            if _CanOverlap(source_text, other_source_text):
+                return SubstituteSequentially
+
+            if dest_text:
+                if _CanOverlap(dest_text, other_source_text):
+                    return SubstituteSequentially
+            elif len(other_source_text) > 1:
+                return SubstituteSequentially
+
+    regex = re.compile("|".join(re.escape(source_text) for source_text in substitutions))
+
+    return lambda value: regex.sub(lambda match: substitutions[match.group(0)], value)
+
+
+# ----------------------------------------------------------------------
+def _CanOverlap(
+    a: str,
+    b: str,
+) -> bool:
+    """Returns True if occurrences of a and b within a string can share characters"""
+
+    return (
+        a in b
+        or b in a
+        or any(a.endswith(b[:index]) for index in range(1, len(b)))
+        or any(b.endswith(a[:index]) for index in range(1, len(a)))
+    )
+
+
+# ----------------------------------------------------------------------
+def _YieldFileEntries(
+    root: Path,
+    *,
+    include_root_files: bool,
+    follow_symlinks: bool,
+) -> Iterator[os.DirEntry]:
+    """Yields the entries of files under root (optionally excluding those directly within root)"""
+
+    # os.scandir (rather than os.walk) allows us to use the cached type information associated with
+    # each entry rather than issuing additional stat calls.
+    directories: list[str] = [str(root)]
+    include_files = include_root_files
+
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if follow_symlinks or not entry.is_symlink():
+                        directories.append(entry.path)
+                elif include_files:
+                    yield entry
+
+        # Only the first directory processed is the root
+        include_files = True
+
+
+# ----------------------------------------------------------------------
+def _YieldJsonArrayItems(
+    filename: Path,
+) -> Iterator[Any]:
+    """Incrementally yields the items of the JSON array stored in filename"""
+
+    decoder = json.JSONDecoder()
+
+    with filename.open() as f:
+        buffer = ""
+        offset = 0
+        is_eof = False
+
+        # ----------------------------------------------------------------------
+        def ReadChunk() -> None:
+            nonlocal buffer, offset, is_eof
+
+            chunk = f.read(_JSON_READ_SIZE)
+            if not chunk:
+                is_eof = True
+                return
+
+            buffer = buffer[offset:] + chunk
+            offset = 0
+
+        # ----------------------------------------------------------------------
+        def PeekChar() -> str:
+            nonlocal offset
+
+            while True:
+                match = _JSON_WHITESPACE_REGEX.match(buffer, offset)
+                assert match is not None
+
+                offset = match.end()
+
+                if offset < len(buffer):
+                    return buffer[offset]
+
+                if is_eof:
+                    return ""
+
+                ReadChunk()
+
+        # ----------------------------------------------------------------------
+
+        if PeekChar() != "[":
+            raise Exception(f"'{filename}' does not contain a JSON array.")
+
+        offset += 1
+
+        if PeekChar() == "]":
+            return
+
+        while True:
+            PeekChar()
+
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, offset)
+
+                    # A value may have been truncated by the end of the buffer (e.g. a number), so
+                    # only accept it once the delimiter that follows it has been read.
+                    if is_eof:
+                        break
+
+                    match = _JSON_WHITESPACE_REGEX.match(buffer, end)
+                    assert match is not None
+
+                    if match.end() < len(buffer) and buffer[match.end()] in ",]":
+                        break
+
+                except json.JSONDecodeError:
+                    if is_eof:
+                        raise
+
+                ReadChunk()
+
+            offset = end
+            yield item
+
+            char = PeekChar()
+
+            if char == "]":
+                return
+
+            if char != ",":
+                raise Exception(f"'{filename}' does not contain a valid JSON array.")
+
+            offset += 1
+
+
+# ----------------------------------------------------------------------
+def _LinkFile(
+    source: Path,
+    dest: Path,
+) -> None:
+    """Creates a hard link to source, falling back to a symlink when that isn't possible"""
+
+    try:
+        os.link(source, dest)
+    except OSError:
+        # The file may be on a different device (when reached through a symlinked directory) or
+        # the file system may not support hard links.
+        os.symlink(source, dest)
+
+
+# ----------------------------------------------------------------------
+def _CalculateFileHash(
+    filename: Path,
+) -> str:
+    """Calculates the hash of a local file (equivalent to Common.CalculateHash) without progress"""
+
+    hasher = hashlib.sha512()
+
+    with filename.open("rb") as f:
+        # Hashing the mapped file avoids copying its content into intermediate buffers; note that
+        # empty files can't be mapped.
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Request aggressive readahead when the platform supports it. Note that the pages
+                # aren't dropped from the cache afterwards, as the restored content is read again
+                # when it is committed.
+                madvise_sequential = getattr(mmap, "MADV_SEQUENTIAL", None)
+                if madvise_sequential is not None:
+                    mapped.madvise(madvise_sequential)
+
+                hasher.update(mapped)
+
+    return hasher.hexdigest()
+
+
+# ----------------------------------------------------------------------
+def _GetFileSize(
+    path: Path,
+) -> int | None:
+    """Returns the size of the file, or None if the path does not refer to a file"""
+
+    try:
+        stat_result = path.stat()
+    except (OSError, ValueError):
+        return None
+
+    if not stat.S_ISREG(stat_result.st_mode):
+        return None
+
+    return stat_result.st_size
+
+
 # ----------------------------------------------------------------------
 def _ScrubZipCommandLine(
     command_line: str,
@@ -1212,20 +1717,17 @@ def _CommitFileBasedDataStore(
     destination_data_store.SetWorkingDir(Path(snapshot_filenames.backup_name))
 
     # Get the files
-    transfer_diffs: list[Common.DiffResult] = []
-
-    for root, _, filenames in file_content_data_store.Walk():
-        transfer_diffs += [
-            Common.DiffResult(
-                Common.DiffOperation.add,
-                filename,
-                "ignore",
-                filename.stat().st_size,
-                None,
-                None,
-            )
-            for filename in [root / filename for filename in filenames]
-        ]
+    transfer_diffs: list[Common.DiffResult] = [
+        Common.DiffResult(
+            Common.DiffOperation.add,
+            filename,
+            "ignore",
+            file_size,
+            None,
+            None,
+        )
+        for filename, file_size in file_content_data_store.WalkFileSizes()
+    ]
 
     Common.ValidateSizeRequirements(
         dm,
@@ -1245,17 +1747,14 @@ def _CommitFileBasedDataStore(
         suffix="\n",
     ) as transfer_dm:
         file_content_root = file_content_data_store.GetWorkingDir()
+        dest_root = Path(file_content_root.name)
 
         # ----------------------------------------------------------------------
         def StripPath(
             path: Path,
             extension: str,
         ) -> Path:
-            return (
-                Path(file_content_root.name)
-                / path.parent.relative_to(file_content_root)
-                / (path.name + extension)
-            )
+            return dest_root / path.parent.relative_to(file_content_root) / (path.name + extension)
 
         # ----------------------------------------------------------------------
 
@@ -1369,20 +1868,33 @@ def _YieldRestoredArchive(
         if not filename_map:
             raise Exception(f"The directory '{directory}' does not contain any files.")
 
-        # Transfer the files
+        # Transfer the files. The files are transferred one at a time, as the remote data stores
+        # (SFTP and FastGlacier) can't execute in parallel; local data stores were handled above.
         for filename_index, (source_filename, dest_filename) in enumerate(filename_map.items()):
             file_size = data_store.GetFileSize(source_filename) or 1
 
             status_template = f"Transferring '{source_filename}' ({filename_index + 1} of {len(filename_map)}) [{PathEx.GetSizeDisplay(file_size)}] {{:.02f}}%..."
+            last_whole_percentage = -1
 
-            Common.WriteFile(
-                data_store,
-                source_filename,
-                dest_filename,
-                lambda bytes_transferred: status_func(
-                    status_template.format((bytes_transferred / file_size) * 100)
-                ),
-            )
+            # ----------------------------------------------------------------------
+            def OnProgress(
+                bytes_transferred: int,
+            ) -> None:
+                # Large files generate many progress updates; only update the status when the
+                # whole percentage changes.
+                nonlocal last_whole_percentage
+
+                percentage = (bytes_transferred / file_size) * 100
+
+                if int(percentage) == last_whole_percentage:
+                    return
+
+                last_whole_percentage = int(percentage)
+                status_func(status_template.format(percentage))
+
+            # ----------------------------------------------------------------------
+
+            Common.WriteFile(data_store, source_filename, dest_filename, OnProgress)
 
         yield temp_directory, True
 
@@ -1416,72 +1928,55 @@ def _YieldRestoredFiles(
     #
     password = encryption_password or str(uuid.uuid4())
 
-    # Validate
-    status_func("Validating archive...")
-
     archive_filename = archive_dir / (ARCHIVE_FILENAME + ".001")
 
     if not archive_filename.is_file():
         raise Exception(f"The archive file '{archive_filename.name}' was not found.")
 
-    result = SubprocessEx.Run(f'{_GetZipBinary()} t "{archive_filename}" "-p{password}"')
-    if result.returncode != 0:
-        raise Exception(
-            textwrap.dedent(
-                """\
-                Archive validation failed for the directory '{}' ({}).
-
-
-                    {}
-
-                """,
-            ).format(
-                directory_name,
-                result.returncode,
-                TextwrapEx.Indent(
-                    result.output.strip(),
-                    4,
-                    skip_first_line=True,
-                ),
-            ),
-        )
-
-    # Extract
+    # Extract. 7zip verifies the content's checksums during extraction, so the archive isn't
+    # validated in a separate pass (which would decompress all of the content twice).
     status_func("Extracting archive...")
 
     with _YieldTempDirectory("extracting the archive") as temp_directory:
+        # The output is only used when errors are encountered (which are still written to stderr),
+        # so don't generate standard or progress output.
         result = SubprocessEx.Run(
-            f'{_GetZipBinary()} x "{archive_filename}" "-p{password}"',
+            f'{_GetZipBinary()} x -mmt=on -bso0 -bsp0 "{archive_filename}" "-p{password}"',
             cwd=temp_directory,
         )
 
-        if result.returncode != 0:
-            raise Exception(
-                textwrap.dedent(
-                    """\
-                    Archive extraction failed for the directory '{}' ({}).
+        if result.returncode == 0:
+            yield temp_directory, True
+            return
 
-                        {}
+    # Raise the exception here (rather than within the block above) so that the partially extracted
+    # content is removed rather than preserved.
+    raise Exception(
+        textwrap.dedent(
+            """\
+            Archive validation failed for the directory '{}' ({}).
 
-                    """,
-                ).format(
-                    directory_name,
-                    result.returncode,
-                    TextwrapEx.Indent(
-                        result.output.strip(),
-                        4,
-                        skip_first_line=True,
-                    ),
-                ),
-            )
 
-        yield temp_directory, True
+                {}
+
+            """,
+        ).format(
+            directory_name,
+            result.returncode,
+            TextwrapEx.Indent(
+                result.output.strip(),
+                4,
+                skip_first_line=True,
+            ),
+        ),
+    )
 
 
 # ----------------------------------------------------------------------
 def _VerifyRestoredFiles(
     directory_name: str,
     contents_dir: Path,
+    ssd: bool,
     status_func: Callable[[str], None],
 ) -> None:
     # Ensure that the index is present
@@ -1490,47 +1985,64 @@ def _VerifyRestoredFiles(
             raise Exception(f"The index file '{index_filename}' does not exist.")
 
     # Ensure that the content is valid
-    all_filenames: list[Path] = []
+    entries = [
+        entry
+        for entry in _YieldFileEntries(
+            contents_dir,
+            include_root_files=True,
+            follow_symlinks=False,
+        )
+        if entry.name != INDEX_HASH_FILENAME
+    ]
 
-    for root_str, _, filenames in os.walk(contents_dir):
-        root = Path(root_str)
+    # Process the files in inode order, which generally matches the order in which they were written
+    # (and their physical location on disk). The inode is only available without an additional stat
+    # call on POSIX systems.
+    if os.name != "nt":
+        entries.sort(key=lambda entry: entry.inode())
 
-        all_filenames += [
-            root / filename for filename in filenames if filename != INDEX_HASH_FILENAME
-        ]
+    all_filenames: list[Path] = [Path(entry.path) for entry in entries]
 
-    data_store = FileSystemDataStore()
+    index_hash_value = (contents_dir / INDEX_HASH_FILENAME).read_text().strip()
 
-    errors: list[str] = []
+    status_lock = threading.Lock()
+    num_completed = 0
 
-    for filename_index, filename in enumerate(all_filenames):
+    # ----------------------------------------------------------------------
+    def ValidateFile(
+        filename: Path,
+    ) -> str | None:
         if filename.name == INDEX_FILENAME:
-            expected_hash_value = (contents_dir / INDEX_HASH_FILENAME).read_text().strip()
+            expected_hash_value = index_hash_value
         else:
             expected_hash_value = filename.name
 
-        file_size = filename.stat().st_size or 1
+        actual_hash_value = _CalculateFileHash(filename)
 
-        status_template = f"Validating file {filename_index + 1} of {len(all_filenames)} [{PathEx.GetSizeDisplay(file_size)}] {{:.02f}}%..."
+        nonlocal num_completed
 
-        actual_hash_value = Common.CalculateHash(
-            data_store,
-            filename,
-            lambda bytes_transferred: status_func(
-                status_template.format((bytes_transferred / file_size) * 100)
-            ),
+        with status_lock:
+            num_completed += 1
+            status_func(f"Validating file {num_completed} of {len(all_filenames)}...")
+
+        if actual_hash_value == expected_hash_value:
+            return None
+
+        return textwrap.dedent(
+            f"""\
+            Filename:  {filename.relative_to(contents_dir)}
+            Expected:  {expected_hash_value}
+            Actual:    {actual_hash_value}
+            """,
         )
 
-        if actual_hash_value != expected_hash_value:
-            errors.append(
-                textwrap.dedent(
-                    f"""\
-                    Filename:  {filename.relative_to(contents_dir)}
-                    Expected:  {expected_hash_value}
-                    Actual:    {actual_hash_value}
-                    """,
-                ),
-            )
+    # ----------------------------------------------------------------------
+
+    # hashlib releases the GIL while hashing, so the files can be validated concurrently with
+    # threads on an SSD. Otherwise, the files are validated one at a time in the order sorted above
+    # to avoid seeking. The results are returned in the original order.
+    with ThreadPoolExecutor(max_workers=None if ssd else 1) as executor:
+        errors = [error for error in executor.map(ValidateFile, all_filenames) if error is not None]
 
     if errors:
         raise Exception(
@@ -13,17 +13,17 @@
 # ----------------------------------------------------------------------
 """Contains the Snapshot object"""
 
-import functools
 import itertools
 import json
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Callable, cast, Generator, Optional
 
 from dbrownell_Common import ExecuteTasks  # type: ignore[import-untyped]
 from dbrownell_Common.InflectEx import inflect  # type: ignore[import-untyped]
-from dbrownell_Common import PathEx  # type: ignore[import-untyped]
 from dbrownell_Common.Streams.Capabilities import Capabilities  # type: ignore[import-untyped]
 from dbrownell_Common.Streams.DoneManager import DoneManager  # type: ignore[import-untyped]
 from rich.progress import Progress, TimeElapsedColumn
@@ -40,7 +40,33 @@ from FileBackup.Impl.Common import (
 
 
 # ----------------------------------------------------------------------
-@dataclass(frozen=True)
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+# Hashing many small files is dominated by the overhead associated with each task rather than the
+# hashing itself; small files are grouped into batches when there are many of them.
+_HASH_BATCH_MIN_NUM_FILES = 1024
+_HASH_BATCH_MAX_NUM_FILES = 256
+_HASH_BATCH_MAX_FILE_SIZE = 64 * 1024
+_HASH_BATCH_MAX_SIZE = 8 * 1024 * 1024
+
+# Modification times are only as precise as the file system's timestamps (2 seconds on FAT), so
+# content written within this window of a hash calculation may change without changing the
+# modification time.
+_HASH_CACHE_TIMESTAMP_GRANULARITY_NS = 2 * 1000 * 1000 * 1000
+
+# DirHashPlaceholder is immutable, so these instances are shared by all directory nodes
+_IMPLICIT_DIR_HASH_PLACEHOLDER = DirHashPlaceholder(explicitly_added=False)
+_EXPLICIT_DIR_HASH_PLACEHOLDER = DirHashPlaceholder(explicitly_added=True)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
 class Snapshot:
     """Collection of files and hashes"""
 
@@ -49,7 +75,7 @@ class Snapshot:
     # |  Public Types
     # |
     # ----------------------------------------------------------------------
-    @dataclass
+    @dataclass(slots=True)
     class Node:
         """Corresponds to a file or directory"""
 
@@ -62,6 +88,9 @@ class Snapshot:
 
         children: dict[str, "Snapshot.Node"] = field(init=False, default_factory=dict)
 
+        # Slots don't support functools.cached_property, so fullpath is cached explicitly
+        _fullpath: Optional[Path] = field(init=False, default=None, compare=False, repr=False)
+
         # ----------------------------------------------------------------------
         @property
         def is_dir(self) -> bool:
@@ -71,21 +100,33 @@ class Snapshot:
         def is_file(self) -> bool:
             return isinstance(self.hash_value, str)
 
-        @functools.cached_property
+        @property
         def fullpath(self) -> Path:
-            names: list[str] = []
+            if self._fullpath is not None:
+                return self._fullpath
 
-            node: Snapshot.Node | None = self
-            while True:
-                assert node is not None
+            # Populate the cached values of all ancestors so that siblings (and their descendants)
+            # can reuse them rather than walking the entire parent chain. This is done iteratively
+            # so that it works with hierarchies of any depth.
+            nodes: list[Snapshot.Node] = []
+            path = Path()
 
-                if node.name is None:
+            node: Snapshot.Node | None = self
+            while node is not None and node.name is not None:
+                if node._fullpath is not None:
+                    path = node._fullpath
                     break
 
-                names.append(node.name)
+                nodes.append(node)
                 node = node.parent
 
-            return Path(*reversed(names))
+            for node in reversed(nodes):
+                assert node.name is not None
+
+                path = path / node.name
+                node._fullpath = path
+
+            return path
 
         # ----------------------------------------------------------------------
         def __post_init__(self):
@@ -107,7 +148,7 @@ class Snapshot:
             cls,
             values: dict[Path, Optional[tuple[str, int]]],
         ) -> "Snapshot.Node":
-            root = cls(None, None, DirHashPlaceholder(explicitly_added=False), None)
+            root = cls(None, None, _IMPLICIT_DIR_HASH_PLACEHOLDER, None)
 
             for path, path_values in values.items():
                 if path_values is None:
@@ -136,7 +177,7 @@ class Snapshot:
             *,
             force: bool = False,
         ) -> "Snapshot.Node":
-            return self._AddImpl(path, DirHashPlaceholder(explicitly_added=True), None, force=force)
+            return self._AddImpl(path, _EXPLICIT_DIR_HASH_PLACEHOLDER, None, force=force)
 
         # ----------------------------------------------------------------------
         def ToJson(self) -> dict[str, Any]:
@@ -160,6 +201,55 @@ class Snapshot:
 
             return result
 
+        # ----------------------------------------------------------------------
+        def ToJsonString(self) -> str:
+            """Returns the same content as `json.dumps(self.ToJson(), separators=(",", ":"))`"""
+
+            # Encode the nodes directly rather than creating (and then encoding) a dict for each
+            # one. An explicit stack is used so that hierarchies of any depth are supported.
+            encode_string = json.encoder.encode_basestring_ascii
+
+            parts: list[str] = []
+            parts_append = parts.append
+
+            # Items are either content to write or (prefix, node) tuples
+            stack: list[str | tuple[str, Snapshot.Node]] = [("", self)]
+            stack_pop = stack.pop
+            stack_append = stack.append
+
+            while stack:
+                item = stack_pop()
+
+                if isinstance(item, str):
+                    parts_append(item)
+                    continue
+
+                prefix, node = item
+
+                if isinstance(node.hash_value, str):
+                    assert node.file_size is not None
+                    assert not node.children
+
+                    parts_append(
+                        f'{prefix}{{"hash_value":{encode_string(node.hash_value)},"file_size":{node.file_size}}}'
+                    )
+
+                    continue
+
+                assert node.file_size is None
+
+                parts_append(f'{prefix}{{"hash_value":null,"children":{{')
+                stack_append("}}")
+
+                last_index = len(node.children) - 1
+
+                for index, (name, child) in enumerate(reversed(node.children.items())):
+                    stack_append(
+                        (("" if index == last_index else ",") + encode_string(name) + ":", child)
+                    )
+
+            return "".join(parts)
+
         # ----------------------------------------------------------------------
         @classmethod
         def FromJson(
@@ -173,7 +263,11 @@ class Snapshot:
             if isinstance(hash_value, str):
                 file_size = value["file_size"]
             else:
-                hash_value = DirHashPlaceholder(explicitly_added=not value["children"])
+                hash_value = (
+                    _IMPLICIT_DIR_HASH_PLACEHOLDER
+                    if value["children"]
+                    else _EXPLICIT_DIR_HASH_PLACEHOLDER
+                )
                 file_size = None
 
             result = cls(name, parent, hash_value, file_size)
@@ -191,140 +285,196 @@ class Snapshot:
             other: Optional["Snapshot.Node"],
             file_compare_func: Callable[["Snapshot.Node", "Snapshot.Node"], bool],
         ) -> tuple[list[DiffResult], Optional[DiffOperation]]:
-            diffs: list[DiffResult] = []
+            # This is implemented with an explicit stack rather than recursion, as snapshots may
+            # contain millions of nodes (and arbitrarily deep hierarchies). All diffs are appended
+            # to a single list; a directory's diffs are the slice of the list that starts at the
+            # length of the list when the directory was encountered.
 
-            if other is None:
-                if self.is_dir and self.children:
-                    for value in self.children.values():
-                        diffs += value.CreateDiffs(None, file_compare_func)[0]
+            # ----------------------------------------------------------------------
+            @dataclass(slots=True)
+            class Frame:
+                parent: Optional["Frame"]
+                start_index: int
+                this: Optional["Snapshot.Node"] = None  # None for the root frame
+                other: Optional["Snapshot.Node"] = None  # None for the root frame
+                atomic_result: Optional[DiffOperation] = None
 
-                else:
-                    diffs.append(
-                        DiffResult(
-                            DiffOperation.add,
-                            self.fullpath,
-                            self.hash_value,
-                            self.file_size,
-                            None,
-                            None,
-                        ),
-                    )
+                # ----------------------------------------------------------------------
+                def UpdateAtomicResult(
+                    self,
+                    result: Optional[DiffOperation],
+                ) -> None:
+                    if self.atomic_result is None:
+                        self.atomic_result = result
+                    elif result != self.atomic_result:
+                        self.atomic_result = DiffOperation.modify
 
-                return diffs, DiffOperation.add
+            # ----------------------------------------------------------------------
 
-            if self.is_file or other.is_file:
-                if self.is_file and other.is_file:
-                    if file_compare_func(self, other):
-                        return [], None
+            diffs: list[DiffResult] = []
 
-                    diffs.append(
-                        DiffResult(
-                            DiffOperation.modify,
-                            self.fullpath,
-                            self.hash_value,
-                            self.file_size,
-                            other.hash_value,
-                            other.file_size,
-                        ),
-                    )
-                else:
-                    # The type has changed
-                    diffs.append(
-                        DiffResult(
-                            DiffOperation.remove,
-                            other.fullpath,
-                            None,
-                            None,
-                            other.hash_value,
-                            other.file_size,
-                        ),
-                    )
+            root_frame = Frame(None, 0)
+
+            # An item without nodes indicates that all of the frame's children have been processed.
+            # The frame associated with nodes is None when their results don't contribute to a
+            # directory's atomic result.
+            stack: list[
+                tuple[Optional["Snapshot.Node"], Optional["Snapshot.Node"], Optional[Frame]]
+            ] = [(self, other, root_frame)]
+
+            # Bind frequently used methods to locals, as this loop is invoked for every node
+            stack_pop = stack.pop
+            stack_append = stack.append
+            diffs_append = diffs.append
+
+            while stack:
+                this, this_other, frame = stack_pop()
+
+                if this is None:
+                    assert frame is not None
+                    assert frame.this is not None
+                    assert frame.other is not None
+                    assert frame.parent is not None
+
+                    # If all of the results are consistent, we can replace the diffs with a diff at
+                    # this level (unless this item has been explicitly added, in which case we
+                    # should keep it around).
+                    if frame.atomic_result == DiffOperation.remove:
+                        assert isinstance(frame.this.hash_value, DirHashPlaceholder)
+                        assert isinstance(frame.other.hash_value, DirHashPlaceholder)
+
+                        if (
+                            frame.this.hash_value.explicitly_added
+                            or frame.other.hash_value.explicitly_added
+                        ):
+                            # We don't want to remove the dir because it has been explicitly added.
+                            # Keep the existing diffs and show that the node has been modified.
+                            frame.atomic_result = DiffOperation.modify
+                        else:
+                            # Replace the existing diffs with a single diff to remove this dir.
+                            del diffs[frame.start_index :]
+
+                            diffs_append(
+                                DiffResult(
+                                    DiffOperation.remove,
+                                    frame.other.fullpath,
+                                    None,
+                                    None,
+                                    frame.other.hash_value,
+                                    frame.other.file_size,
+                                ),
+                            )
+
+                    assert (frame.atomic_result is None and len(diffs) == frame.start_index) or (
+                        frame.atomic_result is not None and len(diffs) > frame.start_index
+                    ), (frame.atomic_result, diffs[frame.start_index :])
+
+                    frame.parent.UpdateAtomicResult(frame.atomic_result)
+                    continue
 
-                    diffs += self.CreateDiffs(None, file_compare_func)[0]
+                if this_other is None:
+                    if this.is_dir and this.children:
+                        stack += [(child, None, None) for child in reversed(this.children.values())]
+                    else:
+                        diffs_append(
+                            DiffResult(
+                                DiffOperation.add,
+                                this.fullpath,
+                                this.hash_value,
+                                this.file_size,
+                                None,
+                                None,
+                            ),
+                        )
 
-                assert diffs
-                return diffs, DiffOperation.modify
+                    if frame is not None:
+                        frame.UpdateAtomicResult(DiffOperation.add)
 
-            # We are looking at directories
-            atomic_result: Optional[DiffOperation] = None
+                    continue
 
-            # ----------------------------------------------------------------------
-            def UpdateAtomicResult(
-                result: Optional[DiffOperation],
-            ) -> None:
-                nonlocal atomic_result
+                this_is_file = isinstance(this.hash_value, str)
+                other_is_file = isinstance(this_other.hash_value, str)
+
+                if this_is_file or other_is_file:
+                    result: Optional[DiffOperation] = DiffOperation.modify
+
+                    if this_is_file and other_is_file:
+                        if file_compare_func(this, this_other):
+                            result = None
+                        else:
+                            diffs_append(
+                                DiffResult(
+                                    DiffOperation.modify,
+                                    this.fullpath,
+                                    this.hash_value,
+                                    this.file_size,
+                                    this_other.hash_value,
+                                    this_other.file_size,
+                                ),
+                            )
+                    else:
+                        # The type has changed
+                        diffs_append(
+                            DiffResult(
+                                DiffOperation.remove,
+                                this_other.fullpath,
+                                None,
+                                None,
+                                this_other.hash_value,
+                                this_other.file_size,
+                            ),
+                        )
 
-                if atomic_result is None:
-                    atomic_result = result
-                elif result != atomic_result:
-                    atomic_result = DiffOperation.modify
+                        stack_append((this, None, None))
 
-            # ----------------------------------------------------------------------
+                    if frame is not None:
+                        frame.UpdateAtomicResult(result)
 
-            for child_name, other_child in other.children.items():
-                if child_name in self.children:
                     continue
 
-                diffs.append(
-                    DiffResult(
-                        DiffOperation.remove,
-                        other.fullpath / child_name,
-                        None,
-                        None,
-                        other_child.hash_value,
-                        other_child.file_size,
-                    ),
-                )
+                # We are looking at directories
+                dir_frame = Frame(frame, len(diffs), this, this_other)
 
-                UpdateAtomicResult(DiffOperation.remove)
-
-            for child_name, this_child in self.children.items():
-                child_diffs, child_result = this_child.CreateDiffs(
-                    other.children.get(child_name, None),
-                    file_compare_func,
-                )
-
-                diffs += child_diffs
-                UpdateAtomicResult(child_result)
-
-            # If all of the results are consistent, we can replace the diffs with a diff at this
-            # level (unless this item has been explicitly added, in which case we should keep it
-            # around).
-            if atomic_result == DiffOperation.remove:
-                assert isinstance(self.hash_value, DirHashPlaceholder)
-                assert isinstance(other.hash_value, DirHashPlaceholder)
+                for child_name, other_child in this_other.children.items():
+                    if child_name in this.children:
+                        continue
 
-                if self.hash_value.explicitly_added or other.hash_value.explicitly_added:
-                    # We don't want to remove the dir because it has been explicitly added.
-                    # Keep the existing diffs and show that the node has been modified.
-                    atomic_result = DiffOperation.modify
-                else:
-                    # Replace the existing diffs with a single diff to remove this dir.
-                    diffs = [
+                    diffs_append(
                         DiffResult(
                             DiffOperation.remove,
-                            other.fullpath,
+                            this_other.fullpath / child_name,
                             None,
                             None,
-                            other.hash_value,
-                            other.file_size,
+                            other_child.hash_value,
+                            other_child.file_size,
                         ),
-                    ]
+                    )
 
-            assert (atomic_result is None and not diffs) or (atomic_result is not None and diffs), (
-                atomic_result,
-                diffs,
-            )
+                    dir_frame.UpdateAtomicResult(DiffOperation.remove)
+
+                stack_append((None, None, dir_frame))
+
+                stack += [
+                    (this_child, this_other.children.get(child_name, None), dir_frame)
+                    for child_name, this_child in reversed(this.children.items())
+                ]
 
-            return diffs, atomic_result
+            return diffs, root_frame.atomic_result
 
         # ----------------------------------------------------------------------
         def Enum(self) -> Generator["Snapshot.Node", None, None]:
-            if self.name is not None:
-                yield self
+            # Use an explicit stack rather than recursive generators, as each level of `yield from`
+            # adds overhead to every item yielded from the levels below it.
+            stack: list[Snapshot.Node] = [self]
 
-            for child in self.children.values():
-                yield from child.Enum()
+            while stack:
+                node = stack.pop()
+
+                if node.name is not None:
+                    yield node
+
+                if node.children:
+                    stack.extend(reversed(node.children.values()))
 
         # ----------------------------------------------------------------------
         # ----------------------------------------------------------------------
@@ -343,9 +493,7 @@ class Snapshot:
                 new_node = node.children.get(part, None)
 
                 if new_node is None:
-                    new_node = self.__class__(
-                        part, node, DirHashPlaceholder(explicitly_added=False), None
-                    )
+                    new_node = self.__class__(part, node, _IMPLICIT_DIR_HASH_PLACEHOLDER, None)
                     node.children[part] = new_node
 
                 node = new_node
@@ -355,6 +503,106 @@ class Snapshot:
 
             return self
 
+    # ----------------------------------------------------------------------
+    class HashCache:
+        """Hash values calculated for files during a previous snapshot, keyed by the file's fingerprint"""
+
+        # ----------------------------------------------------------------------
+        def __init__(
+            self,
+            values: Optional[dict[str, tuple[tuple[int, ...], str]]] = None,
+        ):
+            self._prev_values = values or {}
+            self._values: dict[str, tuple[tuple[int, ...], str]] = {}
+
+            # Hash values for files modified after this time aren't cached, as the content may
+            # change again without changing the fingerprint.
+            self._modified_time_limit_ns = time.time_ns() - _HASH_CACHE_TIMESTAMP_GRANULARITY_NS
+
+        # ----------------------------------------------------------------------
+        @classmethod
+        def Load(
+            cls,
+            filename: Path,
+        ) -> "Snapshot.HashCache":
+            if not filename.is_file():
+                return cls()
+
+            try:
+                with filename.open(encoding="UTF-8") as f:
+                    content = json.load(f)
+
+                return cls(
+                    {
+                        key: (tuple(fingerprint), hash_value)
+                        for key, (fingerprint, hash_value) in content.items()
+                    },
+                )
+            except (OSError, TypeError, ValueError):
+                # The cache is an optimization; invalid content means that hashes will be
+                # recalculated.
+                return cls()
+
+        # ----------------------------------------------------------------------
+        def Persist(
+            self,
+            filename: Path,
+        ) -> None:
+            """Persists the values accessed or set since the cache was created"""
+
+            temp_filename = filename.parent / (filename.name + ".__temp__")
+
+            with temp_filename.open("w", encoding="UTF-8") as f:
+                json.dump(
+                    {
+                        key: [list(fingerprint), hash_value]
+                        for key, (fingerprint, hash_value) in self._values.items()
+                    },
+                    f,
+                )
+
+            temp_filename.replace(filename)
+
+        # ----------------------------------------------------------------------
+        def GetHash(
+            self,
+            filename: Path,
+            fingerprint: tuple[int, ...],
+        ) -> Optional[str]:
+            key = str(filename)
+
+            value = self._prev_values.get(key, None)
+            if value is None or value[0] != fingerprint:
+                return None
+
+            self._values[key] = value
+            return value[1]
+
+        # ----------------------------------------------------------------------
+        def SetHash(
+            self,
+            filename: Path,
+            fingerprint: tuple[int, ...],
+            hash_value: str,
+        ) -> None:
+            # The fingerprint begins with the file's size and modification time
+            if fingerprint[1] >= self._modified_time_limit_ns:
+                return
+
+            self._values[str(filename)] = (fingerprint, hash_value)
+
+        # ----------------------------------------------------------------------
+        def RemoveHash(
+            self,
+            filename: Path,
+        ) -> None:
+            """Removes the hash value for a file whose content no longer matches it"""
+
+            key = str(filename)
+
+            self._prev_values.pop(key, None)
+            self._values.pop(key, None)
+
     # ----------------------------------------------------------------------
     PERSISTED_FILE_NAME = "BackupSnapshot.json"
 
@@ -381,6 +629,7 @@ class Snapshot:
         quiet: bool = False,
         filter_filename_func: Optional[Callable[[Path], bool]] = None,
         calculate_hashes: bool = True,
+        hash_cache: Optional["Snapshot.HashCache"] = None,
     ) -> "Snapshot":
         # Validate that the inputs do not overlap
         assert inputs
@@ -394,20 +643,30 @@ class Snapshot:
         sorted_inputs = list(inputs)
         sorted_inputs.sort(key=lambda value: len(value.parts))
 
-        for input_index in range(1, len(sorted_inputs)):
-            input_item = sorted_inputs[input_index]
+        # Inputs are added to a trie of path parts (where the None key holds the input associated
+        # with the path); sorting ensures that ancestors are added before their descendants.
+        input_trie: dict[Optional[str], Any] = {}
 
-            for query_index in range(0, input_index):
-                query_item = sorted_inputs[query_index]
+        for input_item in sorted_inputs:
+            trie_node = input_trie
 
-                if PathEx.IsDescendant(input_item, query_item):
-                    raise Exception(f"The input '{input_item}' overlaps with '{query_item}'.")
+            for part in input_item.parts:
+                if None in trie_node:
+                    break
+
+                trie_node = trie_node.setdefault(part, {})
+
+            query_item = trie_node.get(None, None)
+            if query_item is not None:
+                raise Exception(f"The input '{input_item}' overlaps with '{query_item}'.")
+
+            trie_node[None] = input_item
 
         # Continue with the calculation
         filter_filename_func = filter_filename_func or (lambda value: True)
 
         # ----------------------------------------------------------------------
-        @dataclass(frozen=True)
+        @dataclass(frozen=True, slots=True)
         class InputInfo:
             # pylint: disable=missing-class-docstring
 
@@ -526,78 +785,150 @@ class Snapshot:
                 all_input_infos[this_root] = input_info
 
         if not any(input_info for input_info in all_input_infos.values()):
-            return cls(Snapshot.Node(None, None, DirHashPlaceholder(explicitly_added=False), None))
+            return cls(Snapshot.Node(None, None, _IMPLICIT_DIR_HASH_PLACEHOLDER, None))
 
         with dm.Nested(
             "\n"
             + ("Calculating hashes..." if calculate_hashes else "Retrieving file information..."),
         ) as hashes_dm:
+            # ----------------------------------------------------------------------
+            def CalculateFileInfo(
+                input_item: Path,
+                file_size: Optional[int],
+                status: ExecuteTasks.Status,
+                on_progress_func: Callable[[int], None],
+            ) -> Optional[tuple[str, int]]:
+                if file_size is None:
+                    status.OnInfo(f"'{input_item}' no longer exists.")
+                    return None
+
+                if not calculate_hashes:
+                    hash_value = "not calculated"
+                else:
+                    fingerprint: Optional[tuple[int, ...]] = None
+                    cached_hash_value: Optional[str] = None
+
+                    if hash_cache is not None:
+                        fingerprint = data_store.GetFileFingerprint(input_item)
+                        if fingerprint is not None:
+                            cached_hash_value = hash_cache.GetHash(input_item, fingerprint)
+
+                    if cached_hash_value is not None:
+                        hash_value = cached_hash_value
+                    else:
+                        hash_value = CalculateHash(data_store, input_item, on_progress_func)
+
+                        if hash_cache is not None and fingerprint is not None:
+                            hash_cache.SetHash(input_item, fingerprint, hash_value)
+
+                return hash_value, file_size
+
             # ----------------------------------------------------------------------
             def PrepareTask(
                 context: Any,
                 on_simple_status_func: Callable[[str], None],  # pylint: disable=unused-argument
             ) -> tuple[int, ExecuteTasks.TransformTasksExTypes.TransformFuncType]:
-                input_item = cast(Path, context)
+                input_items = cast(list[tuple[Path, Optional[int]]], context)
                 del context
 
+                if len(input_items) == 1:
+                    input_item, file_size = input_items[0]
+
+                    # Retrieve this information once, as each call is a round trip for remote
+                    # data stores.
+                    if file_size is None and data_store.GetItemType(input_item) is not None:
+                        file_size = data_store.GetFileSize(input_item)
+
+                    # ----------------------------------------------------------------------
+                    def ExecuteFile(
+                        status: ExecuteTasks.Status,
+                    ) -> list[Optional[tuple[str, int]]]:
+                        return [
+                            CalculateFileInfo(
+                                input_item,
+                                file_size,
+                                status,
+                                lambda bytes_hashed: cast(
+                                    None, status.OnProgress(bytes_hashed, None)
+                                ),
+                            ),
+                        ]
+
+                    # ----------------------------------------------------------------------
+
+                    return 1 if file_size is None else file_size, ExecuteFile
+
                 # ----------------------------------------------------------------------
-                def Execute(
+                def ExecuteBatch(
                     status: ExecuteTasks.Status,
-                ) -> Optional[tuple[str, int]]:
-                    if data_store.GetItemType(input_item) is None:
-                        status.OnInfo(f"'{item_type}' no longer exists.")
-                        return None
+                ) -> list[Optional[tuple[str, int]]]:
+                    results: list[Optional[tuple[str, int]]] = []
 
-                    if not calculate_hashes:
-                        hash_value = "not calculated"
-                    else:
-                        hash_value = CalculateHash(
-                            data_store,
-                            input_item,
-                            lambda bytes_hashed: cast(None, status.OnProgress(bytes_hashed, None)),
+                    # The files are small, so progress is reported per file rather than per byte
+                    for input_item, file_size in input_items:
+                        results.append(
+                            CalculateFileInfo(input_item, file_size, status, lambda _: None)
                         )
+                        status.OnProgress(len(results), None)
 
-                    return hash_value, data_store.GetFileSize(input_item)
+                    return results
 
                 # ----------------------------------------------------------------------
 
-                if data_store.GetItemType(input_item) is None:
-                    file_size = 1
-                else:
-                    file_size = data_store.GetFileSize(input_item)
-
-                return file_size, Execute
+                return len(input_items), ExecuteBatch
 
             # ----------------------------------------------------------------------
 
             file_infos: list[Optional[tuple[str, int]]] = []
 
+            filenames = list(
+                itertools.chain(*(input_info.filenames for input_info in all_input_infos.values()))
+            )
+
+            if len(filenames) < _HASH_BATCH_MIN_NUM_FILES:
+                batches = [[(filename, None)] for filename in filenames]
+            else:
+                batches = _CreateHashBatches(
+                    data_store,
+                    filenames,
+                    run_in_parallel=run_in_parallel,
+                )
+
             tasks: list[ExecuteTasks.TaskData] = [
-                ExecuteTasks.TaskData(str(filename), filename)
-                for filename in itertools.chain(
-                    *(input_info.filenames for input_info in all_input_infos.values())
+                ExecuteTasks.TaskData(
+                    (
+                        str(batch[0][0])
+                        if len(batch) == 1
+                        else "{} and {}".format(
+                            batch[0][0], inflect.no("other file", len(batch) - 1)
+                        )
+                    ),
+                    batch,
                 )
+                for batch in batches
             ]
 
             if tasks:
-                file_infos += cast(
-                    list[Optional[tuple[str, int]]],
-                    ExecuteTasks.TransformTasksEx(
-                        hashes_dm,
-                        "Processing",
-                        tasks,
-                        PrepareTask,
-                        quiet=quiet,
-                        max_num_threads=None if run_in_parallel else 1,
-                        refresh_per_second=EXECUTE_TASKS_REFRESH_PER_SECOND,
-                    ),
-                )
+                for batch_file_infos in ExecuteTasks.TransformTasksEx(
+                    hashes_dm,
+                    "Processing",
+                    tasks,
+                    PrepareTask,
+                    quiet=quiet,
+                    max_num_threads=None if run_in_parallel else 1,
+                    refresh_per_second=EXECUTE_TASKS_REFRESH_PER_SECOND,
+                ):
+                    if batch_file_infos is None:
+                        # The task failed; this is handled below
+                        continue
+
+                    file_infos += cast(list[Optional[tuple[str, int]]], batch_file_infos)
 
                 if hashes_dm.result != 0:
                     raise Exception("Errors were encountered while hashing files.")
 
         with dm.Nested("\nOrganizing results..."):
-            root = Snapshot.Node(None, None, DirHashPlaceholder(explicitly_added=False), None)
+            root = Snapshot.Node(None, None, _IMPLICIT_DIR_HASH_PLACEHOLDER, None)
 
             file_info_offset = 0
 
@@ -642,7 +973,12 @@ class Snapshot:
         snapshot_filename = snapshot_filename or Path(cls.PERSISTED_FILE_NAME)
 
         with dm.Nested(f"Reading '{snapshot_filename}'...") as reading_dm:
-            content = bytes()
+            file_size = data_store.GetFileSize(snapshot_filename)
+
+            # Read directly into a preallocated buffer to avoid allocating and copying each chunk
+            content = bytearray(file_size)
+            content_view = memoryview(content)
+            offset = 0
 
             with reading_dm.YieldStdout() as stdout_context:
                 stdout_context.persist_content = False
@@ -655,23 +991,29 @@ class Snapshot:
                         stdout_context.stream
                     ),
                     transient=True,
+                    refresh_per_second=EXECUTE_TASKS_REFRESH_PER_SECOND,
                 ) as progress_bar:
                     total_progress_id = progress_bar.add_task(
                         f"{stdout_context.line_prefix}Total Progress",
-                        total=data_store.GetFileSize(snapshot_filename),
+                        total=file_size,
                         status="",
                         visible=True,
                     )
 
                     with data_store.Open(snapshot_filename, "rb") as source:
-                        while True:
-                            chunk = source.read(16384)
-                            if not chunk:
+                        while offset < file_size:
+                            bytes_read = source.readinto(
+                                content_view[offset : offset + 1024 * 1024]
+                            )
+                            if not bytes_read:
                                 break
 
-                            content += chunk
+                            offset += bytes_read
 
-                            progress_bar.update(total_progress_id, advance=len(chunk))
+                            progress_bar.update(total_progress_id, advance=bytes_read)
+
+                    content_view.release()
+                    del content[offset:]
 
             try:
                 return Snapshot(
@@ -687,12 +1029,20 @@ class Snapshot:
         data_store: FileBasedDataStore,
         *,
         snapshot_filename: Optional[Path] = None,
-    ) -> None:
+    ) -> int:
+        """Persists the snapshot and returns the number of bytes written"""
+
         snapshot_filename = snapshot_filename or Path(self.__class__.PERSISTED_FILE_NAME)
 
         with dm.Nested(f"Writing '{snapshot_filename}'..."):
+            # The content is ASCII (json escapes all other characters), so the number of characters
+            # is the same as the number of bytes.
+            content = self.node.ToJsonString()
+
             with data_store.Open(snapshot_filename, "w") as f:
-                json.dump(self.node.ToJson(), f)
+                f.write(content)
+
+            return len(content)
 
     # ----------------------------------------------------------------------
     def Diff(
@@ -709,3 +1059,66 @@ class Snapshot:
             compare_func = lambda a, b: a.file_size == b.file_size
 
         yield from self.node.CreateDiffs(other.node, compare_func)[0]
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _CreateHashBatches(
+    data_store: FileBasedDataStore,
+    filenames: list[Path],
+    *,
+    run_in_parallel: bool,
+) -> list[list[tuple[Path, Optional[int]]]]:
+    """\
+    Groups consecutive small files into batches; all other files are placed in their own batch. The
+    file sizes are returned so that they don't need to be retrieved again.
+    """
+
+    # ----------------------------------------------------------------------
+    def GetFileSize(
+        filename: Path,
+    ) -> Optional[int]:
+        try:
+            return data_store.GetFileSize(filename)
+        except OSError:
+            # The file will be retrieved (and reported if it no longer exists) when it is processed
+            return None
+
+    # ----------------------------------------------------------------------
+
+    # Each call may be a round trip for network file systems and remote data stores, so retrieve
+    # the sizes concurrently (as the tasks would have) rather than one at a time.
+    with ThreadPoolExecutor(max_workers=None if run_in_parallel else 1) as executor:
+        file_sizes = list(executor.map(GetFileSize, filenames))
+
+    batches: list[list[tuple[Path, Optional[int]]]] = []
+
+    batch: list[tuple[Path, Optional[int]]] = []
+    batch_size = 0
+
+    for filename, file_size in zip(filenames, file_sizes):
+        if file_size is None or file_size > _HASH_BATCH_MAX_FILE_SIZE:
+            # Flush the current batch to preserve the order of the files
+            if batch:
+                batches.append(batch)
+                batch = []
+                batch_size = 0
+
+            batches.append([(filename, file_size)])
+            continue
+
+        if len(batch) == _HASH_BATCH_MAX_NUM_FILES or batch_size + file_size > _HASH_BATCH_MAX_SIZE:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+
+        batch.append((filename, file_size))
+        batch_size += file_size
+
+    if batch:
+        batches.append(batch)
+
+    return batches
@@ -33,6 +33,60 @@ from FileBackup.Offsite import DEFAULT_ARCHIVE_VOLUME_SIZE
 
 # ----------------------------------------------------------------------
 _this_file = Path(__file__)
+_this_dir = _this_file.parent
+_this_dir_str = str(_this_dir)
+
+# The runner doesn't maintain state across invocations, so a single instance is shared by all tests
+_RUNNER = CliRunner()
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture(scope="session", autouse=True)
+def warm_app():
+    # Build the command tree once so that its cost isn't attributed to whichever test runs first
+    _RUNNER.invoke(app, ["--help"])
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def mirror_backup():
+    with patch("FileBackup.Mirror.Backup") as mocked:
+        yield mocked
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def mirror_validate():
+    with patch("FileBackup.Mirror.Validate") as mocked:
+        yield mocked
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def mirror_cleanup():
+    with patch("FileBackup.Mirror.Cleanup") as mocked:
+        yield mocked
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def offsite_backup():
+    with patch("FileBackup.Offsite.Backup") as mocked:
+        yield mocked
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def offsite_commit():
+    with patch("FileBackup.Offsite.Commit") as mocked:
+        yield mocked
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture
+def offsite_restore():
+    with patch("FileBackup.Offsite.Restore") as mocked:
+        yield mocked
 
 
 @pytest.fixture(InitializeStreamCapabilities(), scope="session", autouse=True)
@@ -40,116 +94,159 @@ _this_file = Path(__file__)
 
 # ----------------------------------------------------------------------
 def test_Version():
-    result = CliRunner().invoke(app, ["version"])
+    result = _RUNNER.invoke(app, ["version"])
 
     assert result.exit_code == 0
     assert result.output == f"FileBackup v{__version__}\n"
 
 
 # ----------------------------------------------------------------------
-def test_Help():
-    result = CliRunner().invoke(app, "--help")
+@pytest.mark.parametrize(
+    "args, expected_values",
+    [
+        (
+            ["--help"],
+            [
+                "Tools to backup and restore files and directories.",
+                "version",
+                "mirror",
+                "offsite",
+            ],
+        ),
+        (
+            ["mirror", "execute", "--help"],
+            ["Mirrors content to a backup data store.", "Data Store Destinations"],
+        ),
+        (
+            ["mirror", "validate", "--help"],
+            [
+                "Validates previously mirrored content in the backup data store.",
+                "Data Store Destinations",
+            ],
+        ),
+        (
+            ["mirror", "cleanup", "--help"],
+            [
+                "Cleans a backup data store after a mirror execution that was interrupted or failed.",
+                "Data Store Destinations",
+            ],
+        ),
+        (
+            ["offsite", "execute", "--help"],
+            ["Prepares local changes for offsite backup.", "Data Store Destinations"],
+        ),
+        (
+            ["offsite", "commit", "--help"],
+            [
+                "Commits a pending snapshot after the changes have been transferred to an offsite data store.",
+            ],
+        ),
+        (
+            ["offsite", "restore", "--help"],
+            ["Restores content from an offsite data store.", "Data Store Destinations"],
+        ),
+    ],
+)
+def test_Help(args, expected_values):
+    result = _RUNNER.invoke(app, args)
 
     assert result.exit_code == 0
-    assert "Tools to backup and restore files and directories." in result.output
-    assert "version" in result.output
-    assert "mirror" in result.output
-    assert "offsite" in result.output
+
+    for expected_value in expected_values:
+        assert expected_value in result.output
 
 
 # ----------------------------------------------------------------------
 class TestMirror:
     class TestExecute:
         # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Mirror.Backup") as backup:
-                result = CliRunner().invoke(
-                    app,
-                    [
-                        "mirror",
-                        "execute",
-                        str(tmp_path),
-                        str(_this_file.parent),
-                    ],
-                )
-
-                assert result.exit_code == 0
-
-                args = backup.call_args_list[0].args
-
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == str(tmp_path), args[1]
-                assert args[2] == [_this_file.parent], args[2]
-
-                kwargs = backup.call_args_list[0].kwargs
-
-                assert kwargs == {
-                    "ssd": False,
-                    "force": False,
-                    "quiet": False,
-                    "file_includes": [],
-                    "file_excludes": [],
-                }
+        def test_Standard(self, tmp_path, mirror_backup):
+            result = _RUNNER.invoke(
+                app,
+                [
+                    "mirror",
+                    "execute",
+                    str(tmp_path),
+                    _this_dir_str,
+                ],
+            )
+
+            assert result.exit_code == 0
+
+            args = mirror_backup.call_args_list[0].args
+
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == str(tmp_path), args[1]
+            assert args[2] == [_this_dir], args[2]
+
+            kwargs = mirror_backup.call_args_list[0].kwargs
+
+            assert kwargs == {
+                "ssd": False,
+                "force": False,
+                "quiet": False,
+                "file_includes": [],
+                "file_excludes": [],
+            }
 
         # ----------------------------------------------------------------------
-        def test_WithFlags(self, tmp_path):
-            with patch("FileBackup.Mirror.Backup") as backup:
-                result = CliRunner().invoke(
-                    app,
-                    [
-                        "mirror",
-                        "execute",
-                        str(tmp_path),
-                        str(_this_file.parent),
-                        "--ssd",
-                        "--force",
-                        "--quiet",
-                        "--file-include",
-                        "one",
-                        "--file-include",
-                        "two",
-                        "--file-exclude",
-                        "three",
-                        "--file-exclude",
-                        "four",
-                        "--file-exclude",
-                        "five",
-                    ],
-                )
-
-                assert result.exit_code == 0
-
-                args = backup.call_args_list[0].args
-
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == str(tmp_path), args[1]
-                assert args[2] == [_this_file.parent], args[2]
-
-                kwargs = backup.call_args_list[0].kwargs
-
-                assert kwargs == {
-                    "ssd": True,
-                    "force": True,
-                    "quiet": True,
-                    "file_includes": [re.compile("^one$"), re.compile("^two$")],
-                    "file_excludes": [
-                        re.compile("^three$"),
-                        re.compile("^four$"),
-                        re.compile("^five$"),
-                    ],
-                }
+        def test_WithFlags(self, tmp_path, mirror_backup):
+            result = _RUNNER.invoke(
+                app,
+                [
+                    "mirror",
+                    "execute",
+                    str(tmp_path),
+                    _this_dir_str,
+                    "--ssd",
+                    "--force",
+                    "--quiet",
+                    "--file-include",
+                    "one",
+                    "--file-include",
+                    "two",
+                    "--file-exclude",
+                    "three",
+                    "--file-exclude",
+                    "four",
+                    "--file-exclude",
+                    "five",
+                ],
+            )
+
+            assert result.exit_code == 0
+
+            args = mirror_backup.call_args_list[0].args
+
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == str(tmp_path), args[1]
+            assert args[2] == [_this_dir], args[2]
+
+            kwargs = mirror_backup.call_args_list[0].kwargs
+
+            assert kwargs == {
+                "ssd": True,
+                "force": True,
+                "quiet": True,
+                "file_includes": [re.compile("^one$"), re.compile("^two$")],
+                "file_excludes": [
+                    re.compile("^three$"),
+                    re.compile("^four$"),
+                    re.compile("^five$"),
+                ],
+            }
 
         # ----------------------------------------------------------------------
         def test_ErrorBadRegex(self, tmp_path):
             expression = "(?:not_valid"
 
-            result = CliRunner().invoke(
+            result = _RUNNER.invoke(
                 app,
                 [
                     "mirror",
                     "execute",
                     str(tmp_path),
-                    str(_this_file.parent),
+                    _this_dir_str,
                     "--file-include",
                     expression,
                 ],
@@ -158,107 +255,72 @@ class TestMirror:
             assert result.exit_code != 0
             assert f"The regular expression '{expression}' is not valid" in result.output
 
-        # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["mirror", "execute", "--help"])
-
-            assert result.exit_code == 0
-
-            assert "Mirrors content to a backup data store." in result.output
-            assert "Data Store Destinations" in result.output
-
     # ----------------------------------------------------------------------
     class TestValidate:
         # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Mirror.Validate") as validate:
-                result = CliRunner().invoke(app, ["mirror", "validate", str(tmp_path)])
+        def test_Standard(self, tmp_path, mirror_validate):
+            result = _RUNNER.invoke(app, ["mirror", "validate", str(tmp_path)])
 
-                assert result.exit_code == 0
-
-                args = validate.call_args_list[0].args
+            assert result.exit_code == 0
 
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == str(tmp_path), args[1]
-                assert args[2] == ValidateType.standard, args[2]
+            args = mirror_validate.call_args_list[0].args
 
-                kwargs = validate.call_args_list[0].kwargs
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == str(tmp_path), args[1]
+            assert args[2] == ValidateType.standard, args[2]
 
-                assert kwargs == {
-                    "ssd": False,
-                    "quiet": False,
-                }
+            kwargs = mirror_validate.call_args_list[0].kwargs
 
-        # ----------------------------------------------------------------------
-        def test_WithFlags(self, tmp_path):
-            with patch("FileBackup.Mirror.Validate") as validate:
-                result = CliRunner().invoke(
-                    app,
-                    [
-                        "mirror",
-                        "validate",
-                        str(tmp_path),
-                        ValidateType.complete.name,
-                        "--ssd",
-                        "--quiet",
-                    ],
-                )
-
-                assert result.exit_code == 0
-
-                args = validate.call_args_list[0].args
-
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == str(tmp_path), args[1]
-                assert args[2] == ValidateType.complete, args[2]
-
-                kwargs = validate.call_args_list[0].kwargs
-
-                assert kwargs == {
-                    "ssd": True,
-                    "quiet": True,
-                }
+            assert kwargs == {
+                "ssd": False,
+                "quiet": False,
+            }
 
         # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["mirror", "validate", "--help"])
+        def test_WithFlags(self, tmp_path, mirror_validate):
+            result = _RUNNER.invoke(
+                app,
+                [
+                    "mirror",
+                    "validate",
+                    str(tmp_path),
+                    ValidateType.complete.name,
+                    "--ssd",
+                    "--quiet",
+                ],
+            )
 
             assert result.exit_code == 0
 
-            assert (
-                "Validates previously mirrored content in the backup data store." in result.output
-            )
-            assert "Data Store Destinations" in result.output
+            args = mirror_validate.call_args_list[0].args
 
-    # ----------------------------------------------------------------------
-    class TestCleanup:
-        # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Mirror.Cleanup") as cleanup:
-                result = CliRunner().invoke(app, ["mirror", "cleanup", str(tmp_path)])
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == str(tmp_path), args[1]
+            assert args[2] == ValidateType.complete, args[2]
 
-                assert result.exit_code == 0
+            kwargs = mirror_validate.call_args_list[0].kwargs
 
-                args = cleanup.call_args_list[0].args
+            assert kwargs == {
+                "ssd": True,
+                "quiet": True,
+            }
 
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == str(tmp_path), args[1]
+    # ----------------------------------------------------------------------
+    class TestCleanup:
+        # ----------------------------------------------------------------------
+        def test_Standard(self, tmp_path, mirror_cleanup):
+            result = _RUNNER.invoke(app, ["mirror", "cleanup", str(tmp_path)])
 
-                kwargs = cleanup.call_args_list[0].kwargs
+            assert result.exit_code == 0
 
-                assert kwargs == {}
+            args = mirror_cleanup.call_args_list[0].args
 
-        # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["mirror", "cleanup", "--help"])
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == str(tmp_path), args[1]
 
-            assert result.exit_code == 0
+            kwargs = mirror_cleanup.call_args_list[0].kwargs
 
-            assert (
-                "Cleans a backup data store after a mirror execution that was interrupted or failed."
-                in result.output
-            )
-            assert "Data Store Destinations" in result.output
+            assert kwargs == {}
 
 
 # ----------------------------------------------------------------------
@@ -266,123 +328,127 @@ class TestOffsite:
     # ----------------------------------------------------------------------
     class TestExecute:
         # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Offsite.Backup") as backup:
-                result = CliRunner().invoke(
-                    app,
-                    [
-                        "offsite",
-                        "execute",
-                        "BackupName",
-                        str(tmp_path),
-                        str(_this_file.parent),
-                    ],
-                )
-
-                assert result.exit_code == 0
-
-                args = backup.call_args_list[0].args
-
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == "BackupName", args[1]
-                assert args[2] == str(tmp_path), args[2]
-                assert args[3] == [_this_file.parent], args[3]
-                assert args[4] is None, args[4]  # encryption password
-                assert isinstance(args[5], Path), args[5]  # working dir
-
-                kwargs = backup.call_args_list[0].kwargs
-
-                assert kwargs == {
-                    "compress": False,
-                    "ssd": False,
-                    "force": False,
-                    "quiet": False,
-                    "file_includes": [],
-                    "file_excludes": [],
-                    "archive_volume_size": DEFAULT_ARCHIVE_VOLUME_SIZE,
-                    "ignore_pending_snapshot": False,
-                }
+        def test_Standard(self, tmp_path, offsite_backup):
+            result = _RUNNER.invoke(
+                app,
+                [
+                    "offsite",
+                    "execute",
+                    "BackupName",
+                    str(tmp_path),
+                    _this_dir_str,
+                ],
+            )
+
+            assert result.exit_code == 0
+
+            args = offsite_backup.call_args_list[0].args
+
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == "BackupName", args[1]
+            assert args[2] == str(tmp_path), args[2]
+            assert args[3] == [_this_dir], args[3]
+            assert args[4] is None, args[4]  # encryption password
+            assert isinstance(args[5], Path), args[5]  # working dir
+
+            kwargs = offsite_backup.call_args_list[0].kwargs
+
+            assert kwargs == {
+                "compress": False,
+                "ssd": False,
+                "force": False,
+                "quiet": False,
+                "file_includes": [],
+                "file_excludes": [],
+                "archive_volume_size": DEFAULT_ARCHIVE_VOLUME_SIZE,
+                "ignore_pending_snapshot": False,
+                "validate_archive": True,
+                "use_hash_cache": False,
+            }
 
         # ----------------------------------------------------------------------
-        def test_WithFlags(self, tmp_path):
-            with patch("FileBackup.Offsite.Backup") as backup:
-                backup_name = str(uuid.uuid4())
-                encryption_password = str(uuid.uuid4())
-                working_dir = tmp_path / "working_dir"
-                archive_volume_size = DEFAULT_ARCHIVE_VOLUME_SIZE // 2
-
-                result = CliRunner().invoke(
-                    app,
-                    [
-                        "offsite",
-                        "execute",
-                        backup_name,
-                        str(tmp_path),
-                        str(_this_file.parent),
-                        "--encryption-password",
-                        encryption_password,
-                        "--compress",
-                        "--ssd",
-                        "--force",
-                        "--quiet",
-                        "--working-dir",
-                        working_dir,
-                        "--archive-volume-size",
-                        str(archive_volume_size),
-                        "--ignore-pending-snapshot",
-                        "--file-include",
-                        "one",
-                        "--file-include",
-                        "two",
-                        "--file-exclude",
-                        "three",
-                        "--file-exclude",
-                        "four",
-                        "--file-exclude",
-                        "five",
-                    ],
-                )
-
-                assert result.exit_code == 0
-
-                args = backup.call_args_list[0].args
-
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == backup_name, args[1]
-                assert args[2] == str(tmp_path), args[2]
-                assert args[3] == [_this_file.parent], args[3]
-                assert args[4] == encryption_password, args[4]
-                assert args[5] == working_dir, args[5]
-
-                kwargs = backup.call_args_list[0].kwargs
-
-                assert kwargs == {
-                    "compress": True,
-                    "ssd": True,
-                    "force": True,
-                    "quiet": True,
-                    "file_includes": [re.compile("^one$"), re.compile("^two$")],
-                    "file_excludes": [
-                        re.compile("^three$"),
-                        re.compile("^four$"),
-                        re.compile("^five$"),
-                    ],
-                    "archive_volume_size": archive_volume_size,
-                    "ignore_pending_snapshot": True,
-                }
+        def test_WithFlags(self, tmp_path, offsite_backup):
+            backup_name = str(uuid.uuid4())
+            encryption_password = str(uuid.uuid4())
+            working_dir = tmp_path / "working_dir"
+            archive_volume_size = DEFAULT_ARCHIVE_VOLUME_SIZE // 2
+
+            result = _RUNNER.invoke(
+                app,
+                [
+                    "offsite",
+                    "execute",
+                    backup_name,
+                    str(tmp_path),
+                    _this_dir_str,
+                    "--encryption-password",
+                    encryption_password,
+                    "--compress",
+                    "--ssd",
+                    "--force",
+                    "--quiet",
+                    "--working-dir",
+                    working_dir,
+                    "--archive-volume-size",
+                    str(archive_volume_size),
+                    "--ignore-pending-snapshot",
+                    "--skip-archive-validation",
+                    "--hash-cache",
+                    "--file-include",
+                    "one",
+                    "--file-include",
+                    "two",
+                    "--file-exclude",
+                    "three",
+                    "--file-exclude",
+                    "four",
+                    "--file-exclude",
+                    "five",
+                ],
+            )
+
+            assert result.exit_code == 0
+
+            args = offsite_backup.call_args_list[0].args
+
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == backup_name, args[1]
+            assert args[2] == str(tmp_path), args[2]
+            assert args[3] == [_this_dir], args[3]
+            assert args[4] == encryption_password, args[4]
+            assert args[5] == working_dir, args[5]
+
+            kwargs = offsite_backup.call_args_list[0].kwargs
+
+            assert kwargs == {
+                "compress": True,
+                "ssd": True,
+                "force": True,
+                "quiet": True,
+                "file_includes": [re.compile("^one$"), re.compile("^two$")],
+                "file_excludes": [
+                    re.compile("^three$"),
+                    re.compile("^four$"),
+                    re.compile("^five$"),
+                ],
+                "archive_volume_size": archive_volume_size,
+                "ignore_pending_snapshot": True,
+                "validate_archive": False,
+                "use_hash_cache": True,
+            }
 
         # ----------------------------------------------------------------------
         def test_ErrorBadRegex(self, tmp_path):
             expression = "(?:not_valid"
 
-            result = CliRunner().invoke(
+            result = _RUNNER.invoke(
                 app,
                 [
                     "offsite",
                     "execute",
                     "BackupName",
                     str(tmp_path),
-                    str(_this_file.parent),
+                    _this_dir_str,
                     "--file-include",
                     expression,
                 ],
@@ -391,132 +457,98 @@ class TestOffsite:
             assert result.exit_code != 0
             assert f"The regular expression '{expression}' is not valid" in result.output
 
-        # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["offsite", "execute", "--help"])
-
-            assert result.exit_code == 0
-
-            assert "Prepares local changes for offsite backup." in result.output
-            assert "Data Store Destinations" in result.output
-
     # ----------------------------------------------------------------------
     class TestCommit:
         # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Offsite.Commit") as commit:
-                result = CliRunner().invoke(app, ["offsite", "commit", "BackupName"])
+        def test_Standard(self, tmp_path, offsite_commit):
+            result = _RUNNER.invoke(app, ["offsite", "commit", "BackupName"])
 
-                assert result.exit_code == 0
+            assert result.exit_code == 0
 
-                args = commit.call_args_list[0].args
+            args = offsite_commit.call_args_list[0].args
 
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == "BackupName", args[1]
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == "BackupName", args[1]
 
-                kwargs = commit.call_args_list[0].kwargs
+            kwargs = offsite_commit.call_args_list[0].kwargs
 
-                assert kwargs == {}
-
-        # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["offsite", "commit", "--help"])
-
-            assert result.exit_code == 0
-
-            assert (
-                "Commits a pending snapshot after the changes have been transferred to an offsite data store."
-                in result.output
-            )
+            assert kwargs == {}
 
     # ----------------------------------------------------------------------
     class TestRestore:
         # ----------------------------------------------------------------------
-        def test_Standard(self, tmp_path):
-            with patch("FileBackup.Offsite.Restore") as restore:
-                result = CliRunner().invoke(
-                    app, ["offsite", "restore", "BackupName", str(tmp_path)]
-                )
+        def test_Standard(self, tmp_path, offsite_restore):
+            result = _RUNNER.invoke(app, ["offsite", "restore", "BackupName", str(tmp_path)])
 
-                assert result.exit_code == 0
+            assert result.exit_code == 0
 
-                args = restore.call_args_list[0].args
+            args = offsite_restore.call_args_list[0].args
 
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == "BackupName", args[1]
-                assert args[2] == str(tmp_path), args[2]
-                assert args[3] is None, args[3]  # encryption password
-                assert isinstance(args[4], Path), args[4]  # working dir
-                assert args[5] == {}
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == "BackupName", args[1]
+            assert args[2] == str(tmp_path), args[2]
+            assert args[3] is None, args[3]  # encryption password
+            assert isinstance(args[4], Path), args[4]  # working dir
+            assert args[5] == {}
 
-                kwargs = restore.call_args_list[0].kwargs
+            kwargs = offsite_restore.call_args_list[0].kwargs
 
-                assert kwargs == {
-                    "ssd": False,
-                    "quiet": False,
-                    "dry_run": False,
-                    "overwrite": False,
-                }
+            assert kwargs == {
+                "ssd": False,
+                "quiet": False,
+                "dry_run": False,
+                "overwrite": False,
+            }
 
         # ----------------------------------------------------------------------
-        def test_WithFlags(self, tmp_path):
-            with patch("FileBackup.Offsite.Restore") as restore:
-                backup_name = str(uuid.uuid4())
-                encryption_password = str(uuid.uuid4())
-                working_dir = tmp_path / "working_dir"
-                dir_subs = {
-                    "one": "two",
-                    "three": "four",
-                }
-
-                args = [
-                    "offsite",
-                    "restore",
-                    backup_name,
-                    str(tmp_path),
-                    "--working-dir",
-                    working_dir,
-                    "--encryption-password",
-                    encryption_password,
-                ]
-
-                for k, v in dir_subs.items():
-                    args += ["--dir-substitution", f"{k}:{v}"]
-
-                args += [
-                    "--dry-run",
-                    "--overwrite",
-                    "--ssd",
-                    "--quiet",
-                ]
-
-                result = CliRunner().invoke(app, args)
-
-                assert result.exit_code == 0
-
-                args = restore.call_args_list[0].args
+        def test_WithFlags(self, tmp_path, offsite_restore):
+            backup_name = str(uuid.uuid4())
+            encryption_password = str(uuid.uuid4())
+            working_dir = tmp_path / "working_dir"
+            dir_subs = {
+                "one": "two",
+                "three": "four",
+            }
+
+            args = [
+                "offsite",
+                "restore",
+                backup_name,
+                str(tmp_path),
+                "--working-dir",
+                working_dir,
+                "--encryption-password",
+                encryption_password,
+            ]
+
+            for k, v in dir_subs.items():
+                args += ["--dir-substitution", f"{k}:{v}"]
+
+            args += [
+                "--dry-run",
+                "--overwrite",
+                "--ssd",
+                "--quiet",
+            ]
+
+            result = _RUNNER.invoke(app, args)
 
-                assert isinstance(args[0], DoneManager), args[0]
-                assert args[1] == backup_name, args[1]
-                assert args[2] == str(tmp_path), args[2]
-                assert args[3] == encryption_password, args[3]
-                assert args[4] == working_dir, args[4]
-                assert args[5] == dir_subs
-
-                kwargs = restore.call_args_list[0].kwargs
+            assert result.exit_code == 0
 
-                assert kwargs == {
-                    "ssd": True,
-                    "quiet": True,
-                    "dry_run": True,
-                    "overwrite": True,
-                }
+            args = offsite_restore.call_args_list[0].args
 
-        # ----------------------------------------------------------------------
-        def test_Help(self):
-            result = CliRunner().invoke(app, ["offsite", "restore", "--help"])
+            assert isinstance(args[0], DoneManager), args[0]
+            assert args[1] == backup_name, args[1]
+            assert args[2] == str(tmp_path), args[2]
+            assert args[3] == encryption_password, args[3]
+            assert args[4] == working_dir, args[4]
+            assert args[5] == dir_subs
 
-            assert result.exit_code == 0
+            kwargs = offsite_restore.call_args_list[0].kwargs
 
-            assert "Restores content from an offsite data store." in result.output
-            assert "Data Store Destinations" in result.output
+            assert kwargs == {
+                "ssd": True,
+                "quiet": True,
+                "dry_run": True,
+                "overwrite": True,
+            }
@@ -0,0 +1,221 @@
+# ----------------------------------------------------------------------
+# |
+# |  Common_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2026-10-16 00:30:00
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2026
+# |  Distributed under the MIT License.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for Common.py"""
+
+import hashlib
+import os
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from FileBackup.DataStore.FileSystemDataStore import FileSystemDataStore
+from FileBackup.Impl.Common import *
+from FileBackup.Impl.Common import _AdviseFile, _CopyFileRange
+
+
+# ----------------------------------------------------------------------
+class TestWriteFile:
+    # ----------------------------------------------------------------------
+    def test_Standard(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+        status_func = mock.MagicMock()
+
+        WriteFile(
+            FileSystemDataStore(tmp_path),
+            source_filename,
+            Path("dest") / "file",
+            status_func,
+        )
+
+        assert (tmp_path / "dest" / "file").read_bytes() == source_filename.read_bytes()
+        assert status_func.call_args_list[-1] == mock.call(len(_CONTENT))
+        assert [item.name for item in (tmp_path / "dest").iterdir()] == ["file"]
+
+    # ----------------------------------------------------------------------
+    def test_ExpectedHash(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        WriteFile(
+            FileSystemDataStore(tmp_path),
+            source_filename,
+            Path("dest") / "file",
+            lambda bytes_written: None,
+            expected_hash=hashlib.sha512(_CONTENT).hexdigest(),
+        )
+
+        assert (tmp_path / "dest" / "file").read_bytes() == _CONTENT
+
+    # ----------------------------------------------------------------------
+    def test_ExpectedHashMismatch(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with pytest.raises(
+            Exception,
+            match="The content of '.+' changed after it was hashed.",
+        ):
+            WriteFile(
+                FileSystemDataStore(tmp_path),
+                source_filename,
+                Path("dest") / "file",
+                lambda bytes_written: None,
+                expected_hash=hashlib.sha512(b"Other content").hexdigest(),
+            )
+
+        # Neither the file nor its temporary file are preserved
+        assert list((tmp_path / "dest").iterdir()) == []
+
+    # ----------------------------------------------------------------------
+    def test_CopyFileRangeReportsNoContent(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        # Some files report no content via copy_file_range, even though content is available
+        with mock.patch.object(os, "copy_file_range", return_value=0, create=True):
+            WriteFile(
+                FileSystemDataStore(tmp_path),
+                source_filename,
+                Path("dest") / "file",
+                lambda bytes_written: None,
+            )
+
+        assert (tmp_path / "dest" / "file").read_bytes() == _CONTENT
+
+    # ----------------------------------------------------------------------
+    def test_CopyFileRangeNotSupported(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with mock.patch.object(os, "copy_file_range", side_effect=OSError(), create=True):
+            WriteFile(
+                FileSystemDataStore(tmp_path),
+                source_filename,
+                Path("dest") / "file",
+                lambda bytes_written: None,
+            )
+
+        assert (tmp_path / "dest" / "file").read_bytes() == _CONTENT
+
+
+# ----------------------------------------------------------------------
+class TestCopyFileRange:
+    # ----------------------------------------------------------------------
+    def test_NotAvailable(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(os, "copy_file_range", None, create=True),
+            source_filename.open("rb") as source,
+            (tmp_path / "dest").open("wb") as dest,
+        ):
+            assert _CopyFileRange(source, dest, lambda bytes_written: None) is False
+
+    # ----------------------------------------------------------------------
+    def test_NoFileDescriptor(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with source_filename.open("rb") as source:
+            dest = mock.MagicMock(spec=[])
+
+            assert _CopyFileRange(source, dest, lambda bytes_written: None) is False
+
+    # ----------------------------------------------------------------------
+    def test_ErrorAfterContentWritten(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(
+                os,
+                "copy_file_range",
+                side_effect=[len(_CONTENT) // 2, OSError("Copy error")],
+                create=True,
+            ),
+            source_filename.open("rb") as source,
+            (tmp_path / "dest").open("wb") as dest,
+        ):
+            # The content can't be copied in another way once some of it has been written
+            with pytest.raises(OSError, match="Copy error"):
+                _CopyFileRange(source, dest, lambda bytes_written: None)
+
+
+# ----------------------------------------------------------------------
+class TestAdviseFile:
+    # ----------------------------------------------------------------------
+    def test_Standard(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(os, "posix_fadvise", create=True) as posix_fadvise_mock,
+            mock.patch.object(os, "POSIX_FADV_SEQUENTIAL", 2, create=True),
+            source_filename.open("rb") as source,
+        ):
+            _AdviseFile(source, "POSIX_FADV_SEQUENTIAL")
+
+            assert posix_fadvise_mock.call_args_list == [mock.call(source.fileno(), 0, 0, 2)]
+
+    # ----------------------------------------------------------------------
+    def test_NotAvailable(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(os, "posix_fadvise", None, create=True),
+            source_filename.open("rb") as source,
+        ):
+            _AdviseFile(source, "POSIX_FADV_SEQUENTIAL")
+
+    # ----------------------------------------------------------------------
+    def test_UnknownAdvice(self, tmp_path):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(os, "posix_fadvise", create=True) as posix_fadvise_mock,
+            source_filename.open("rb") as source,
+        ):
+            _AdviseFile(source, "POSIX_FADV_DOES_NOT_EXIST")
+
+            assert posix_fadvise_mock.call_count == 0
+
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("exception", [OSError(), AttributeError()])
+    def test_Error(self, tmp_path, exception):
+        source_filename = _MakeSource(tmp_path)
+
+        with (
+            mock.patch.object(os, "posix_fadvise", side_effect=exception, create=True),
+            mock.patch.object(os, "POSIX_FADV_SEQUENTIAL", 2, create=True),
+            source_filename.open("rb") as source,
+        ):
+            # The hint is optional, so errors are ignored
+            _AdviseFile(source, "POSIX_FADV_SEQUENTIAL")
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+_CONTENT = b"The file content" * 1000
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _MakeSource(
+    tmp_path: Path,
+) -> Path:
+    source_filename = tmp_path / "source"
+    source_filename.write_bytes(_CONTENT)
+
+    return source_filename
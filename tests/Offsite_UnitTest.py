@@ -13,8 +13,10 @@
 # ----------------------------------------------------------------------
 """Unit tests for Offsite.py"""
 
+import json
 import os
 import re
+import stat
 
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -28,6 +30,7 @@ import pytest
 from dbrownell_Common.TestHelpers.StreamTestHelpers import GenerateDoneManagerAndContent
 
 from FileBackup.Offsite import *
+from FileBackup.Offsite import _CreateSubstituteFunc, _YieldJsonArrayItems
 
 import TestHelpers
 
@@ -39,6 +42,106 @@ def test_SnapshotFilenames():
     assert sfs.backup_name == "the_name"
     assert sfs.standard == PathEx.GetUserDirectory() / "OffsiteFileBackup.the_name.json"
     assert sfs.pending == PathEx.GetUserDirectory() / "OffsiteFileBackup.the_name.__pending__.json"
+    assert sfs.hash_cache == PathEx.GetUserDirectory() / "OffsiteFileBackup.the_name.hashcache.json"
+
+
+# ----------------------------------------------------------------------
+class TestYieldJsonArrayItems:
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("read_size", [1, 2, 3])
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "[]",
+            "  [ ]  ",
+            "[1]",
+            "[12345, -6.789e+10, 0]",
+            '["a\\"b", "{[]}", "]\\\\", {"key": "}, {"}, ["[", "]"]]',
+            '\r\n\t [\n  {"one": 1, "two": [true, false, null]} ,\n  "three"\n] \n',
+        ],
+    )
+    def test_Standard(self, tmp_path, read_size, content):
+        filename = tmp_path / "content.json"
+        filename.write_text(content)
+
+        with mock.patch("FileBackup.Offsite._JSON_READ_SIZE", read_size):
+            assert list(_YieldJsonArrayItems(filename)) == json.loads(content)
+
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("read_size", [1, 2, 3])
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "",
+            "   ",
+            '{"one": 1}',
+            "[",
+            "[1",
+            "[1,",
+            "[1 2]",
+            '["abc',
+            "[12, 3",
+            "[tru]",
+        ],
+    )
+    def test_Invalid(self, tmp_path, read_size, content):
+        filename = tmp_path / "content.json"
+        filename.write_text(content)
+
+        with mock.patch("FileBackup.Offsite._JSON_READ_SIZE", read_size):
+            with pytest.raises(Exception):
+                list(_YieldJsonArrayItems(filename))
+
+
+# ----------------------------------------------------------------------
+class TestCreateSubstituteFunc:
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize(
+        "substitutions",
+        [
+            {},
+            {"one": "1"},
+            {"one": "1", "two": "2"},
+            # Overlapping sources
+            {"ab": "X", "bc": "Y"},
+            {"abc": "X", "b": "Y"},
+            {"aa": "X", "a": "Y"},
+            # A replacement that forms a later source
+            {"a": "b", "b": "c"},
+            {"x": "a", "ab": "Z"},
+            # A replacement that forms an earlier source
+            {"b": "c", "a": "b"},
+            # Empty replacements
+            {"-": "", "ab": "X"},
+            {"-": "", "a": "X"},
+            {"a": "", "b": ""},
+            # Paths
+            {"/src/dir1": "/dest/dir1", "/src/dir2": "/dest/dir2", "/src": "/other"},
+        ],
+    )
+    def test_MatchesSequentialReplace(self, substitutions):
+        func = _CreateSubstituteFunc(substitutions)
+
+        for value in [
+            "",
+            "one two three",
+            "abc",
+            "aaa",
+            "abcabc",
+            "xb",
+            "a-b",
+            "a--bab",
+            "ba",
+            "/src/dir1/file",
+            "/src/dir2/file",
+            "/src/dir3/file",
+        ]:
+            expected = value
+
+            for source_text, dest_text in substitutions.items():
+                expected = expected.replace(source_text, dest_text)
+
+            assert func(value) == expected, (substitutions, value)
 
 
 # ----------------------------------------------------------------------
@@ -119,6 +222,27 @@ class TestBackup:
 
             assert len(_PathInfo.Create(helper.snapshot_dir).filenames) == 1
 
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("validate_archive", [False, True])
+    def test_ValidateArchive(self, _working_dir, tmp_path_factory, validate_archive):
+        with _YieldInitializedBackupHelper(tmp_path_factory, _working_dir, True, None) as helper:
+            with (_working_dir / "New File").open("w") as f:
+                f.write("New File")
+
+            output = helper.ExecuteBackup(
+                _working_dir,
+                True,
+                None,
+                validate_archive=validate_archive,
+            )
+
+            assert ("Validating archive..." in output) == validate_archive
+
+            result = helper.GetBackupInfo()
+
+            assert len(result.primary_dirs) == 1
+            assert len(result.delta_dirs) == 1
+
     # ----------------------------------------------------------------------
     @pytest.mark.parametrize("encryption_password", [None, str(uuid.uuid4())])
     @pytest.mark.parametrize("compress", [False, True])
@@ -772,6 +896,59 @@ class TestBackup:
                     )
                 )
 
+    # ----------------------------------------------------------------------
+    def test_HashCache(self, _working_dir, tmp_path_factory):
+        with _YieldBackupHelper(tmp_path_factory) as helper:
+            hash_cache_filename = SnapshotFilenames.Create(helper.backup_name).hash_cache
+
+            # The cache isn't persisted when the backup fails
+            with mock.patch(
+                "FileBackup.Impl.Common.ValidateSizeRequirements",
+                side_effect=lambda dm, *args, **kwargs: setattr(dm, "result", -1),
+            ):
+                helper.ExecuteBackup(_working_dir, False, None, use_hash_cache=True)
+
+            assert not hash_cache_filename.exists()
+
+            helper.ExecuteBackup(_working_dir, False, None, use_hash_cache=True)
+
+            assert hash_cache_filename.is_file()
+
+    # ----------------------------------------------------------------------
+    def test_HashCacheStaleValue(self, _working_dir, tmp_path_factory):
+        with _YieldBackupHelper(tmp_path_factory) as helper:
+            helper.ExecuteBackup(_working_dir, False, None, use_hash_cache=True)
+
+            hash_cache_filename = SnapshotFilenames.Create(helper.backup_name).hash_cache
+
+            new_filename = _working_dir / "New File"
+
+            with new_filename.open("w") as f:
+                f.write("New File")
+
+            # Simulate a cached hash value that no longer matches the file's content
+            with hash_cache_filename.open() as f:
+                content = json.load(f)
+
+            content[str(new_filename)] = [
+                list(cast(tuple[int, ...], FileSystemDataStore().GetFileFingerprint(new_filename))),
+                "0" * 128,
+            ]
+
+            with hash_cache_filename.open("w") as f:
+                json.dump(content, f)
+
+            output = helper.ExecuteBackup(_working_dir, False, None, use_hash_cache=True)
+            assert f"ERROR: {new_filename}: " in output
+
+            # The stale value is removed from the cache, so the next backup succeeds
+            with hash_cache_filename.open() as f:
+                assert str(new_filename) not in json.load(f)
+
+            helper.ExecuteBackup(_working_dir, False, None, use_hash_cache=True)
+
+            assert len(helper.GetBackupInfo().delta_dirs) == 1
+
 
 # ----------------------------------------------------------------------
 class TestCommit(object):
@@ -1053,6 +1230,180 @@ class TestRestore(object):
             assert len(path_info.filenames) == 9
             assert len(path_info.empty_dirs) == 1
 
+    # ----------------------------------------------------------------------
+    def test_OverwriteRemovedDir(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            shutil.rmtree(_working_dir / "VeryLongPaths")
+
+            backup_helper.ExecuteBackup(_working_dir, False, None)
+
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            # This directory exists before the restore and is removed when the restored content is
+            # committed, so content for other files can't be staged within it.
+            (restore_helper.output_dir / "VeryLongPaths").mkdir()
+
+            restore_helper.ExecuteRestore(8, overwrite=True)
+
+    # ----------------------------------------------------------------------
+    def test_HardLinks(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            with (
+                mock.patch("FileBackup.Offsite.os.link", wraps=os.link) as link_mock,
+                mock.patch("FileBackup.Offsite.os.symlink", wraps=os.symlink) as symlink_mock,
+            ):
+                restore_helper.ExecuteRestore(10)
+
+            # The content is on the same device as the staging directory
+            assert link_mock.call_count == 9
+            assert _GetStagedSymlinkCalls(symlink_mock) == []
+
+    # ----------------------------------------------------------------------
+    def test_HardLinkError(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            with (
+                mock.patch("FileBackup.Offsite.os.link", side_effect=OSError()) as link_mock,
+                mock.patch("FileBackup.Offsite.os.symlink", wraps=os.symlink) as symlink_mock,
+            ):
+                restore_helper.ExecuteRestore(10)
+
+            assert link_mock.call_count == 9
+            assert len(_GetStagedSymlinkCalls(symlink_mock)) == 9
+
+    # ----------------------------------------------------------------------
+    def test_DifferentDevice(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            original_stat = Path.stat
+
+            # ----------------------------------------------------------------------
+            def NewStat(self, *args, **kwargs):
+                result = original_stat(self, *args, **kwargs)
+
+                # Report the restored content as being on a different device than the staging
+                # directory
+                if self.is_relative_to(restore_helper.restore_working_dir):
+                    values = list(result[:10])
+                    values[stat.ST_DEV] += 1
+
+                    result = os.stat_result(values)
+
+                return result
+
+            # ----------------------------------------------------------------------
+
+            with (
+                mock.patch.object(Path, "stat", autospec=True, side_effect=NewStat),
+                mock.patch("FileBackup.Offsite.os.link", wraps=os.link) as link_mock,
+                mock.patch("FileBackup.Offsite.os.symlink", wraps=os.symlink) as symlink_mock,
+            ):
+                restore_helper.ExecuteRestore(10)
+
+            assert link_mock.call_count == 0
+            assert len(_GetStagedSymlinkCalls(symlink_mock)) == 9
+
+    # ----------------------------------------------------------------------
+    def test_ConcurrentCommit(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            # Create changes that are committed in the same group as (and after) their ancestors
+            shutil.rmtree(_working_dir / "two" / "Dir1")
+            _MakeFile(_working_dir, _working_dir / "two" / "Dir1")
+            (_working_dir / "one" / "A").unlink()
+            _MakeFile(_working_dir, _working_dir / "one" / "A" / "Nested")
+
+            backup_helper.ExecuteBackup(_working_dir, False, None)
+
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            restore_helper.ExecuteRestore(9, ssd=True)
+
+    # ----------------------------------------------------------------------
+    def test_CommitError(self, _working_dir, tmp_path_factory):
+        with _YieldInitializedBackupHelper(
+            tmp_path_factory, _working_dir, False, None
+        ) as backup_helper:
+            restore_helper = _RestoreHelper.Create(
+                _working_dir,
+                tmp_path_factory,
+                None,
+                None,
+                backup_helper.backup_name,
+                backup_helper.output_dir,
+            )
+
+            original_replace = os.replace
+
+            # ----------------------------------------------------------------------
+            def NewReplace(source, dest):
+                if Path(dest).name == "A":
+                    raise Exception("Commit error")
+
+                original_replace(source, dest)
+
+            # ----------------------------------------------------------------------
+
+            with (
+                mock.patch("FileBackup.Offsite.os.replace", side_effect=NewReplace),
+                pytest.raises(Exception, match="Commit error"),
+            ):
+                restore_helper.ExecuteRestore(None)
+
+            # Groups are committed in order, and no groups are committed after the failure
+            assert (restore_helper.output_dir / "VeryLongPaths").is_dir()
+            assert not (restore_helper.output_dir / "one" / "A").exists()
+            assert not (restore_helper.output_dir / "one" / "BC").exists()
+            assert not (restore_helper.output_dir / "two").exists()
+
     # ----------------------------------------------------------------------
     def test_DryRun(self, _working_dir, tmp_path_factory):
         with _YieldInitializedBackupHelper(
@@ -1398,6 +1749,8 @@ class _BackupHelper(object):
         provide_destination: bool = True,
         force: bool = False,
         ignore_pending_snapshot: bool = False,
+        validate_archive: bool = True,
+        use_hash_cache: bool = False,
     ) -> str:
         dm_and_content = iter(GenerateDoneManagerAndContent())
 
@@ -1415,6 +1768,8 @@ class _BackupHelper(object):
             file_includes=None,
             file_excludes=None,
             ignore_pending_snapshot=ignore_pending_snapshot,
+            validate_archive=validate_archive,
+            use_hash_cache=use_hash_cache,
         )
 
         return cast(str, next(dm_and_content))
@@ -1485,6 +1840,7 @@ class _RestoreHelper(object):
         dry_run: bool = False,
         overwrite: bool = False,
         decorate_restored_files: bool = True,
+        ssd: bool = False,
     ) -> str:
         dm_and_content = iter(GenerateDoneManagerAndContent())
 
@@ -1510,7 +1866,7 @@ class _RestoreHelper(object):
                     self.original_dir.as_posix(): self.output_dir.as_posix(),
                 }
             ),
-            ssd=False,
+            ssd=ssd,
             quiet=False,
             dry_run=dry_run,
             overwrite=overwrite,
@@ -1563,6 +1919,17 @@ class _PathInfo(object):
 # |
 # |  Private Functions
 # |
+# ----------------------------------------------------------------------
+def _GetStagedSymlinkCalls(
+    symlink_mock: mock.MagicMock,
+) -> list:
+    # The symlinks created for the restored directories (rather than the staged content) specify
+    # the target type.
+    return [
+        call for call in symlink_mock.call_args_list if "target_is_directory" not in call.kwargs
+    ]
+
+
 # ----------------------------------------------------------------------
 def _MakeFile(
     root: Path,
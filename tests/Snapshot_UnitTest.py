@@ -14,14 +14,18 @@
 """Unit tests for the Snapshot module"""
 
 import copy
+import hashlib
 import os
 import re
+import sys
+import time
 
 from io import StringIO
 from unittest import mock
 
 import pytest
 
+from dbrownell_Common import PathEx
 from dbrownell_Common.TestHelpers.StreamTestHelpers import InitializeStreamCapabilities
 
 from FileBackup.DataStore.FileSystemDataStore import FileSystemDataStore
@@ -444,6 +448,188 @@ class TestCalculate:
             },
         )
 
+    # ----------------------------------------------------------------------
+    def test_HashCache(self, local_working_dir, tmp_path):
+        dm_mock = mock.MagicMock()
+
+        dm_mock.Nested().__enter__().result = 0
+
+        hash_cache_filename = tmp_path / "HashCache.json"
+
+        _AgeFiles(local_working_dir)
+
+        hash_cache = Snapshot.HashCache.Load(hash_cache_filename)
+
+        original_result = Snapshot.Calculate(
+            dm_mock,
+            [local_working_dir],
+            FileSystemDataStore(local_working_dir),
+            run_in_parallel=False,
+            hash_cache=hash_cache,
+        )
+
+        hash_cache.Persist(hash_cache_filename)
+
+        # Files that haven't changed should not be hashed again
+        with mock.patch("FileBackup.Snapshot.CalculateHash", wraps=CalculateHash) as hash_mock:
+            result = Snapshot.Calculate(
+                dm_mock,
+                [local_working_dir],
+                FileSystemDataStore(local_working_dir),
+                run_in_parallel=False,
+                hash_cache=Snapshot.HashCache.Load(hash_cache_filename),
+            )
+
+            assert hash_mock.call_count == 0
+
+        assert result == original_result
+
+        # Modified files should be hashed again
+        with (local_working_dir / "StableFile1").open("a") as f:
+            f.write("Modified")
+
+        with mock.patch("FileBackup.Snapshot.CalculateHash", wraps=CalculateHash) as hash_mock:
+            result = Snapshot.Calculate(
+                dm_mock,
+                [local_working_dir],
+                FileSystemDataStore(local_working_dir),
+                run_in_parallel=False,
+                hash_cache=Snapshot.HashCache.Load(hash_cache_filename),
+            )
+
+            assert hash_mock.call_count == 1
+
+        assert result == Snapshot.Calculate(
+            dm_mock,
+            [local_working_dir],
+            FileSystemDataStore(local_working_dir),
+            run_in_parallel=False,
+        )
+
+    # ----------------------------------------------------------------------
+    def test_HashCacheSameSizeAndModifiedTime(self, local_working_dir, tmp_path):
+        dm_mock = mock.MagicMock()
+
+        dm_mock.Nested().__enter__().result = 0
+
+        hash_cache_filename = tmp_path / "HashCache.json"
+
+        _AgeFiles(local_working_dir)
+
+        hash_cache = Snapshot.HashCache.Load(hash_cache_filename)
+
+        Snapshot.Calculate(
+            dm_mock,
+            [local_working_dir],
+            FileSystemDataStore(local_working_dir),
+            run_in_parallel=False,
+            hash_cache=hash_cache,
+        )
+
+        hash_cache.Persist(hash_cache_filename)
+
+        # Change the content without changing the size or modification time
+        filename = local_working_dir / "StableFile1"
+
+        stat_result = filename.stat()
+        content = filename.read_text()
+
+        filename.write_text(("X" if content[0] != "X" else "Y") + content[1:])
+        os.utime(filename, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+        assert filename.stat().st_size == stat_result.st_size
+        assert filename.stat().st_mtime_ns == stat_result.st_mtime_ns
+
+        with mock.patch("FileBackup.Snapshot.CalculateHash", wraps=CalculateHash) as hash_mock:
+            result = Snapshot.Calculate(
+                dm_mock,
+                [local_working_dir],
+                FileSystemDataStore(local_working_dir),
+                run_in_parallel=False,
+                hash_cache=Snapshot.HashCache.Load(hash_cache_filename),
+            )
+
+            assert hash_mock.call_count == 1
+
+        assert result == Snapshot.Calculate(
+            dm_mock,
+            [local_working_dir],
+            FileSystemDataStore(local_working_dir),
+            run_in_parallel=False,
+        )
+
+    # ----------------------------------------------------------------------
+    def test_HashCacheRecentlyModified(self, local_working_dir, tmp_path):
+        dm_mock = mock.MagicMock()
+
+        dm_mock.Nested().__enter__().result = 0
+
+        hash_cache_filename = tmp_path / "HashCache.json"
+
+        hash_cache = Snapshot.HashCache.Load(hash_cache_filename)
+
+        Snapshot.Calculate(
+            dm_mock,
+            [local_working_dir],
+            FileSystemDataStore(local_working_dir),
+            run_in_parallel=False,
+            hash_cache=hash_cache,
+        )
+
+        hash_cache.Persist(hash_cache_filename)
+
+        # The files were modified within the timestamp granularity of the calculation, so their
+        # content may change without changing their modification times; they aren't cached.
+        with mock.patch("FileBackup.Snapshot.CalculateHash", wraps=CalculateHash) as hash_mock:
+            Snapshot.Calculate(
+                dm_mock,
+                [local_working_dir],
+                FileSystemDataStore(local_working_dir),
+                run_in_parallel=False,
+                hash_cache=Snapshot.HashCache.Load(hash_cache_filename),
+            )
+
+            assert hash_mock.call_count == 3
+
+    # ----------------------------------------------------------------------
+    @pytest.mark.parametrize("run_in_parallel", [False, True])
+    def test_ManySmallFiles(self, tmp_path, run_in_parallel):
+        dm_mock = mock.MagicMock()
+
+        dm_mock.Nested().__enter__().result = 0
+
+        filenames: list[Path] = []
+
+        for index in range(1100):
+            filename = tmp_path / "Dir{}".format(index // 100) / "File{}".format(index)
+
+            _MakeFile(tmp_path, filename)
+            filenames.append(filename)
+
+            if index == 550:
+                # Large files are processed individually
+                filename = tmp_path / "LargeFile"
+
+                with filename.open("wb") as f:
+                    f.write(b"0123456789" * 10000)
+
+                filenames.append(filename)
+
+        result = Snapshot.Calculate(
+            dm_mock,
+            [tmp_path],
+            FileSystemDataStore(tmp_path),
+            run_in_parallel=run_in_parallel,
+        )
+
+        expected: dict[Path, tuple[str, int]] = {}
+
+        for filename in filenames:
+            content = filename.read_bytes()
+            expected[filename] = (hashlib.sha512(content).hexdigest(), len(content))
+
+        assert result.node == Snapshot.Node.Create(expected)
+
     # ----------------------------------------------------------------------
     def test_DoesNotExistError(self):
         with pytest.raises(
@@ -482,6 +668,30 @@ class TestCalculate:
                 run_in_parallel=False,
             )
 
+    # ----------------------------------------------------------------------
+    @mock.patch.object(Path, "is_dir")
+    @mock.patch.object(Path, "exists")
+    def test_CalculateOverlapErrorSameInput(self, mocked_exists, mocked_is_dir):
+        mocked_exists.return_value = True
+        mocked_is_dir.return_value = True
+
+        with pytest.raises(
+            Exception,
+            match=re.escape(
+                "The input '{}' overlaps with '{}'.".format(Path("one/two"), Path("one/two"))
+            ),
+        ):
+            Snapshot.Calculate(
+                mock.MagicMock(),
+                [
+                    Path("one/twothree"),
+                    Path("one/two"),
+                    Path("one/two"),
+                ],
+                FileSystemDataStore(Path()),
+                run_in_parallel=False,
+            )
+
     # ----------------------------------------------------------------------
     def test_UnsupportedFileType(self, working_dir):
         os.symlink(working_dir / "two" / "File1", working_dir / "two" / "symFile")
@@ -568,8 +778,9 @@ class TestPersistAndLoad:
         data_store = FileSystemDataStore(tmp_path)
 
         assert result.IsPersisted(data_store) is False
-        result.Persist(dm_mock, data_store)
+        persisted_size = result.Persist(dm_mock, data_store)
         assert result.IsPersisted(data_store) is True
+        assert persisted_size == (tmp_path / Snapshot.PERSISTED_FILE_NAME).stat().st_size
 
         loaded_result = Snapshot.LoadPersisted(dm_mock, data_store)
 
@@ -1368,6 +1579,35 @@ class TestDiff:
             ),
         ]
 
+    # ----------------------------------------------------------------------
+    def test_DeepHierarchy(self):
+        deep_dir = Path(*(["dir"] * (sys.getrecursionlimit() + 10)))
+
+        snapshot = Snapshot(Snapshot.Node.Create({deep_dir / "file": ("hash(file)", 1)}))
+        other = Snapshot(Snapshot.Node.Create({deep_dir / "file": ("hash(other)", 2)}))
+
+        assert list(snapshot.Diff(other)) == [
+            DiffResult(
+                DiffOperation.modify,
+                deep_dir / "file",
+                "hash(file)",
+                1,
+                "hash(other)",
+                2,
+            ),
+        ]
+
+        assert list(snapshot.Diff(Snapshot(Snapshot.Node.Create({})))) == [
+            DiffResult(
+                DiffOperation.add,
+                deep_dir / "file",
+                "hash(file)",
+                1,
+                None,
+                None,
+            ),
+        ]
+
 
 # ----------------------------------------------------------------------
 class TestDirHashPlaceholder:
@@ -1454,6 +1694,23 @@ class TestNodeProperties:
             ),
         ]
 
+    # ----------------------------------------------------------------------
+    def test_ToJsonString(self):
+        root = Snapshot.Node(None, None, DirHashPlaceholder(explicitly_added=False), None)
+
+        assert root.ToJsonString() == json.dumps(root.ToJson(), separators=(",", ":"))
+
+        root.AddFile(Path("one/file1"), "file1", 1)
+        root.AddFile(Path("one/two/file2"), "file2", 2)
+        root.AddFile(Path('one/\u00e9 "quoted" \\ name'), "file3", 3)
+        root.AddDir(Path("one/empty_dir"))
+        root.AddFile(Path("file4"), "file4", 0)
+
+        assert root.ToJsonString() == json.dumps(root.ToJson(), separators=(",", ":"))
+
+        file_node = root.children["one"].children["file1"]
+        assert file_node.ToJsonString() == json.dumps(file_node.ToJson(), separators=(",", ":"))
+
 
 # ----------------------------------------------------------------------
 # ----------------------------------------------------------------------
@@ -1468,6 +1725,17 @@ def _MakeFile(
         f.write(PathEx.CreateRelativePath(root, path).as_posix())
 
 
+# ----------------------------------------------------------------------
+def _AgeFiles(
+    root: Path,
+) -> None:
+    # Files modified recently aren't cached
+    timestamp = time.time() - 60 * 60
+
+    for filename in root.iterdir():
+        os.utime(filename, (timestamp, timestamp))
+
+
 # ----------------------------------------------------------------------
 @pytest.fixture(scope="module")
 def working_dir(tmp_path_factory):